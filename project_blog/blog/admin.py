@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from blog.models import Post, Comment
+from blog.models import Comment, Post
+from blog.moderation import save_moderation
 
 # Register your models here.
 
@@ -19,6 +20,24 @@ class PostAdmin(admin.ModelAdmin):
 
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
-    list_display = ["name", "email", "post", "created", "active"]
-    list_filter = ["active", "created", "updated"]
+    list_display = ["name", "email", "post", "created", "active", "moderated"]
+    list_filter = ["active", "moderated", "created", "updated"]
     search_fields = ["name", "email", "body"]
+    actions = ["approve", "reject"]
+
+    def moderate(self, request, queryset, active: bool):
+        comments = list(queryset.only("id", "post_id"))
+        for comment in comments:
+            comment.active = active
+        save_moderation(comments)
+        return len(comments)
+
+    @admin.action(description="Approve selected comments")
+    def approve(self, request, queryset):
+        count = self.moderate(request, queryset, active=True)
+        self.message_user(request, f"{count} comment(s) approved.")
+
+    @admin.action(description="Reject selected comments")
+    def reject(self, request, queryset):
+        count = self.moderate(request, queryset, active=False)
+        self.message_user(request, f"{count} comment(s) rejected.")
@@ -0,0 +1,204 @@
+"""
+Seeded dataset and request benchmark for the blog views.
+
+seed() fills the database with a reproducible set of posts, tags and comments
+through the import_posts command. run_benchmark() then requests every
+endpoint through the Django test client and reports latency percentiles and
+query counts per endpoint.
+"""
+
+import json
+import random
+import time
+from collections.abc import Callable
+from contextlib import ExitStack
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+from taggit.models import Tag
+
+from blog.models import Post
+
+WORDS = (
+    "django python query cache index database template view model request "
+    "response server client performance latency memory thread worker queue "
+    "search feed sitemap markdown comment tag post page cursor batch stream"
+).split()
+
+PERCENTILES = (50, 95, 99)
+
+
+def markdown_body(rng: random.Random, paragraphs: int) -> str:
+    blocks = []
+    for number in range(paragraphs):
+        words = rng.choices(WORDS, k=rng.randint(40, 120))
+        if number == 0:
+            words[rng.randrange(len(words))] = f"**{rng.choice(WORDS)}**"
+        blocks.append(" ".join(words).capitalize() + ".")
+        if number % 3 == 2:
+            blocks.append(f"## {rng.choice(WORDS).capitalize()}")
+    return "\n\n".join(blocks)
+
+
+def seed(
+    posts: int = 1000,
+    tags: int = 50,
+    tags_per_post: int = 3,
+    comments_per_post: int = 5,
+    random_seed: int = 0,
+    batch_size: int = 500,
+) -> None:
+    """
+    Create ``posts`` published posts owned by a "benchmark" user. Tags are
+    picked with a Zipf-like distribution so that a few tags are on most of
+    the posts, and every post gets up to twice ``comments_per_post`` comments.
+    """
+    rng = random.Random(random_seed)
+    author, _ = get_user_model().objects.get_or_create(username="benchmark")
+    tag_names = [f"tag-{number}" for number in range(tags)]
+    tag_weights = [1 / rank for rank in range(1, tags + 1)]
+    now = timezone.now()
+
+    with TemporaryDirectory() as data_dir:
+        path = Path(data_dir) / "posts.jsonl"
+        with path.open("w", encoding="utf-8") as stream:
+            for number in range(posts):
+                title = " ".join(rng.choices(WORDS, k=5)).capitalize()
+                publish = now - timedelta(minutes=rng.randint(1, 60 * 24 * 730))
+                data = {
+                    "title": title,
+                    "slug": f"post-{number}",
+                    "author": author.username,
+                    "body": markdown_body(rng, rng.randint(2, 8)),
+                    "status": Post.Status.PUBLISHED,
+                    "publish": publish.isoformat(),
+                    "tags": sorted(
+                        set(rng.choices(tag_names, tag_weights, k=tags_per_post))
+                    ),
+                    "comments": [
+                        {
+                            "name": f"reader-{rng.randrange(1000)}",
+                            "email": "reader@example.com",
+                            "body": " ".join(rng.choices(WORDS, k=20)),
+                            "active": rng.random() > 0.1,
+                            "moderated": True,
+                        }
+                        for _ in range(rng.randint(0, comments_per_post * 2))
+                    ],
+                }
+                stream.write(json.dumps(data) + "\n")
+        call_command(
+            "import_posts", str(path), batch_size=batch_size, stdout=StringIO()
+        )
+
+
+def default_endpoints(sample: int = 20) -> dict[str, list[str]]:
+    """
+    Return the URLs requested for every endpoint, built from the data in the
+    database.
+    """
+    posts = list(Post.published.order_by("?").only("slug", "publish")[:sample])
+    top_tag = (
+        Tag.objects.annotate(posts=Count("taggit_taggeditem_items"))
+        .order_by("-posts")
+        .first()
+    )
+    search = reverse("blog:post_search")
+    return {
+        "post_list": [reverse("blog:post_list")],
+        "post_list_by_tag": [reverse("blog:post_list_by_tag", args=[top_tag.slug])]
+        if top_tag
+        else [],
+        "post_detail": [post.get_absolute_url() for post in posts],
+        "post_search": [f"{search}?query={word}" for word in WORDS[:sample]],
+        "feed": [reverse("blog:post_feed")],
+        "sitemap_index": [reverse("sitemap_index")],
+        "sitemap": [reverse("django.contrib.sitemaps.views.sitemap", args=["posts"])],
+    }
+
+
+def percentile(values: list[float], percent: int) -> float:
+    ordered = sorted(values)
+    index = max(0, round(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the queries.
+    """
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def measure(
+    client: Client, urls: list[str], requests: int, before: Callable[[], None]
+) -> dict:
+    latencies = []
+    queries = []
+    for number in range(requests):
+        before()
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            # Every alias, the reads may be routed to a replica.
+            for alias_connection in connections.all():
+                stack.enter_context(alias_connection.execute_wrapper(counter))
+            start = time.perf_counter()
+            response = client.get(urls[number % len(urls)])
+            latencies.append((time.perf_counter() - start) * 1000)
+        if response.status_code != 200:
+            raise AssertionError(
+                f"{urls[number % len(urls)]} answered {response.status_code}."
+            )
+        queries.append(counter.count)
+    result = {"requests": requests}
+    result.update(
+        {
+            f"p{percent}_ms": round(percentile(latencies, percent), 3)
+            for percent in PERCENTILES
+        }
+    )
+    result.update(
+        {
+            "mean_queries": round(sum(queries) / requests, 2),
+            "max_queries": max(queries),
+        }
+    )
+    return result
+
+
+def run_benchmark(
+    requests: int = 100,
+    cold: bool = False,
+    endpoints: dict[str, list[str]] | None = None,
+) -> dict[str, dict]:
+    """
+    Request every endpoint ``requests`` times and return its latency
+    percentiles in milliseconds and its query counts. With ``cold`` the cache
+    is cleared before every request.
+    """
+    if endpoints is None:
+        endpoints = default_endpoints()
+    client = Client()
+    before = cache.clear if cold else lambda: None
+    cache.clear()
+    return {
+        name: measure(client, urls, requests, before)
+        for name, urls in endpoints.items()
+        if urls
+    }
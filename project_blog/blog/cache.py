@@ -0,0 +1,69 @@
+"""
+Namespaced cache helpers for the blog.
+
+Every namespace has a generation stored in the cache and each key built for
+the namespace embeds it. Invalidating a namespace only replaces its
+generation, which makes all the keys built before unreachable at once.
+"""
+
+import time
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import cache
+
+FEED = "feed"
+POST_DETAIL = "post_detail"
+SEARCH = "search"
+SIDEBAR = "sidebar"
+SITEMAP = "sitemap"
+
+
+def _generation_key(namespace: str) -> str:
+    return f"blog:{namespace}:generation"
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    generation = cache.get_or_set(
+        _generation_key(namespace), time.time_ns, timeout=None
+    )
+    return ":".join(["blog", namespace, str(generation), *map(str, parts)])
+
+
+def get_or_set(
+    namespace: str,
+    parts: Iterable[Any],
+    default: Callable[[], Any],
+    timeout: int | None = None,
+) -> Any:
+    if timeout is None:
+        timeout = settings.BLOG_CACHE_TIMEOUT
+    return cache.get_or_set(make_key(namespace, *parts), default, timeout=timeout)
+
+
+def invalidate(*namespaces: str) -> None:
+    cache.set_many(
+        {_generation_key(namespace): time.time_ns() for namespace in namespaces},
+        timeout=None,
+    )
+
+
+def delete(namespace: str, parts: Iterable[Any]) -> None:
+    cache.delete(make_key(namespace, *parts))
+
+
+def delete_many(namespace: str, parts_list: Iterable[Iterable[Any]]) -> None:
+    cache.delete_many([make_key(namespace, *parts) for parts in parts_list])
+
+
+def post_detail_parts(year: int, month: int, day: int, slug: str) -> list[Any]:
+    return ["state", year, month, day, slug]
+
+
+def invalidate_post_detail(post) -> None:
+    publish = post.publish
+    delete(
+        POST_DETAIL,
+        post_detail_parts(publish.year, publish.month, publish.day, post.slug),
+    )
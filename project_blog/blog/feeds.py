@@ -1,24 +1,73 @@
-from markdown import markdown
+import hashlib
+
+from django.conf import settings
 from django.contrib.syndication.views import Feed
-from django.template.defaultfilters import truncatewords_html
+from django.http import HttpResponse
 from django.urls import reverse_lazy
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe, quote_etag
 
+from blog import cache
 from blog.models import Post
 
 
-class LatestPostsFeed(Feed):
+class CachedFeed(Feed):
+    """
+    Feed whose document is cached until a published post changes, and which
+    answers conditional GETs with 304 responses.
+    """
+
+    def __call__(self, request, *args, **kwargs):
+        feed = cache.get_or_set(
+            cache.FEED,
+            [type(self).__name__, request.scheme, *args, *kwargs.values()],
+            lambda: self.render_feed(request, *args, **kwargs),
+        )
+        response = HttpResponse(feed["content"], content_type=feed["content_type"])
+        response.headers["ETag"] = feed["etag"]
+        response.headers["Last-Modified"] = feed["last_modified"]
+        return get_conditional_response(
+            request,
+            etag=feed["etag"],
+            last_modified=parse_http_date_safe(feed["last_modified"]),
+            response=response,
+        )
+
+    def render_feed(self, request, *args, **kwargs) -> dict:
+        response = super().__call__(request, *args, **kwargs)
+        return {
+            "content": response.content,
+            "content_type": response.headers["Content-Type"],
+            "etag": quote_etag(hashlib.md5(response.content).hexdigest()),
+            "last_modified": response.headers["Last-Modified"],
+        }
+
+
+class LatestPostsFeed(CachedFeed):
     title = "My blog"
     link = reverse_lazy("blog:post_list")
     description = "New posts of my blog."
+    item_fields = ["title", "slug", "publish", "updated", "excerpt_html"]
 
     def items(self):
-        return Post.published.all()[:5]
+        return Post.published.only(*self.item_fields)[: settings.BLOG_FEED_ITEMS]
 
     def item_title(self, item):
         return item.title
 
     def item_description(self, item):
-        return truncatewords_html(markdown(text=item.body), 30)
+        return item.excerpt_html
 
     def item_pubdate(self, item):
         return item.publish
+
+    def item_updateddate(self, item):
+        return item.updated
+
+
+class FullPostsFeed(LatestPostsFeed):
+    description = "New posts of my blog, in full."
+    item_fields = ["title", "slug", "publish", "updated", "body_html"]
+
+    def item_description(self, item):
+        return item.body_html
@@ -0,0 +1,67 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from blog.benchmark import run_benchmark, seed
+from blog.models import Post
+from replicas.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and report latency percentiles and "
+        "query counts of the blog views as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--tags", type=int, default=50)
+        parser.add_argument("--tags-per-post", type=int, default=3)
+        parser.add_argument("--comments-per-post", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=100,
+            help="Number of requests sent to every endpoint.",
+        )
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Clear the cache before every request.",
+        )
+        parser.add_argument(
+            "--keepdb",
+            action="store_true",
+            help="Keep the seeded test database and reuse it on the next run.",
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, keepdb=options["keepdb"]
+        )
+        try:
+            # Only the primary is switched to the test database, the replicas
+            # still point to the real one.
+            with use_primary():
+                if not Post.objects.exists():
+                    seed(
+                        posts=options["posts"],
+                        tags=options["tags"],
+                        tags_per_post=options["tags_per_post"],
+                        comments_per_post=options["comments_per_post"],
+                        random_seed=options["seed"],
+                    )
+                results = run_benchmark(
+                    requests=options["requests"], cold=options["cold"]
+                )
+        finally:
+            connection.creation.destroy_test_db(
+                old_name, verbosity=0, keepdb=options["keepdb"]
+            )
+            teardown_test_environment()
+        self.stdout.write(json.dumps(results, indent=2))
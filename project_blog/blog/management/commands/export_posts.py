@@ -0,0 +1,58 @@
+import json
+import sys
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+POST_FIELDS = ["title", "slug", "body", "status", "publish", "created", "updated"]
+COMMENT_FIELDS = ["name", "email", "body", "created", "updated", "active", "moderated"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Export posts with their tags and comments as JSON lines, one post per "
+        "line, in constant memory."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "output",
+            nargs="?",
+            default="-",
+            help="File to write the posts to, or - for the standard output.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        posts = (
+            Post.objects.select_related("author")
+            .prefetch_related("tags", "comments")
+            .order_by("id")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        output = options["output"]
+        stream = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+        exported = 0
+        try:
+            for post in posts:
+                stream.write(
+                    json.dumps(self.serialize(post), default=datetime.isoformat)
+                )
+                stream.write("\n")
+                exported += 1
+        finally:
+            if stream is not sys.stdout:
+                stream.close()
+        self.stderr.write(self.style.SUCCESS(f"Exported {exported} post(s)."))
+
+    def serialize(self, post: Post) -> dict:
+        data = {field: getattr(post, field) for field in POST_FIELDS}
+        data["author"] = post.author.get_username()
+        data["tags"] = [tag.name for tag in post.tags.all()]
+        data["comments"] = [
+            {field: getattr(comment, field) for field in COMMENT_FIELDS}
+            for comment in post.comments.all()
+        ]
+        return data
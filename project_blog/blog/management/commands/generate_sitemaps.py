@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.contrib.sitemaps.views import SitemapIndexItem
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand
+from django.template.loader import render_to_string
+
+from blog.sitemaps import sitemaps
+
+
+class Command(BaseCommand):
+    help = "Write the sitemap index and its pages as static XML files."
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", type=Path)
+        parser.add_argument("--protocol", default="https")
+        parser.add_argument(
+            "--base-url",
+            help="URL the files are served from, defaults to the current site.",
+        )
+
+    def handle(self, *args, **options):
+        output_dir: Path = options["output_dir"]
+        output_dir.mkdir(parents=True, exist_ok=True)
+        protocol = options["protocol"]
+        current_site = Site.objects.get_current()
+        base_url = options["base_url"] or f"{protocol}://{current_site.domain}"
+
+        index = []
+        for section, sitemap_class in sitemaps.items():
+            site = sitemap_class()
+            for page in range(1, site.paginator.num_pages + 1):
+                urls = site.get_urls(page=page, site=current_site, protocol=protocol)
+                filename = f"sitemap-{section}-{page}.xml"
+                (output_dir / filename).write_text(
+                    render_to_string("sitemap.xml", {"urlset": urls})
+                )
+                index.append(
+                    SitemapIndexItem(
+                        f"{base_url.rstrip('/')}/{filename}",
+                        getattr(site, "latest_lastmod", None),
+                    )
+                )
+
+        (output_dir / "sitemap.xml").write_text(
+            render_to_string("sitemap_index.xml", {"sitemaps": index})
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Wrote {len(index)} sitemap page(s) to {output_dir}.")
+        )
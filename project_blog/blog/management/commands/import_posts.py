@@ -0,0 +1,160 @@
+import json
+import sys
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+from taggit.models import Tag
+
+from blog import cache
+from blog.management.commands.export_posts import COMMENT_FIELDS, POST_FIELDS
+from blog.models import Comment, Post
+from blog.similar import rebuild_all_similar_posts
+from blog.tag_counts import refresh_tag_post_counts
+
+DATETIME_FIELDS = {"publish", "created", "updated"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Import posts with their tags and comments from the JSON lines written "
+        "by export_posts, in batches of bulk inserts."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "input",
+            nargs="?",
+            default="-",
+            help="File to read the posts from, or - for the standard input.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        self.authors = {}
+        self.tags = {}
+        self.content_type = ContentType.objects.get_for_model(Post)
+
+        source = options["input"]
+        stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+        imported = 0
+        try:
+            lines = enumerate(stream, start=1)
+            while batch := list(islice(lines, options["batch_size"])):
+                imported += self.import_batch(batch)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        # Bulk inserts skip the model signals, which maintain the similar
+        # posts one post at a time.
+        if imported:
+            rebuild_all_similar_posts()
+        cache.invalidate(
+            cache.FEED, cache.POST_DETAIL, cache.SEARCH, cache.SIDEBAR, cache.SITEMAP
+        )
+        self.stdout.write(self.style.SUCCESS(f"Imported {imported} post(s)."))
+
+    def parse(self, line_number: int, line: str) -> dict:
+        try:
+            data = json.loads(line)
+            for field in DATETIME_FIELDS & data.keys():
+                data[field] = parse_datetime(data[field])
+            for comment in data.get("comments", []):
+                for field in DATETIME_FIELDS & comment.keys():
+                    comment[field] = parse_datetime(comment[field])
+        except (AttributeError, TypeError, ValueError) as e:
+            raise CommandError(f"Line {line_number}: invalid post: {e}")
+        return data
+
+    def resolve_authors(self, rows: list[tuple[int, dict]]) -> None:
+        usernames = {data.get("author") for _, data in rows} - self.authors.keys()
+        User = get_user_model()
+        self.authors.update(
+            User.objects.filter(
+                **{f"{User.USERNAME_FIELD}__in": usernames}
+            ).values_list(User.USERNAME_FIELD, "id")
+        )
+        for line_number, data in rows:
+            if data.get("author") not in self.authors:
+                raise CommandError(
+                    f"Line {line_number}: unknown author {data.get('author')!r}."
+                )
+
+    def resolve_tags(self, names: set[str]) -> None:
+        missing = names - self.tags.keys()
+        self.tags.update(Tag.objects.filter(name__in=missing).values_list("name", "id"))
+        for name in missing - self.tags.keys():
+            # Tag.save() takes care of picking a unique slug.
+            self.tags[name] = Tag.objects.create(name=name).id
+
+    @transaction.atomic
+    def import_batch(self, batch: list[tuple[int, str]]) -> int:
+        rows = [
+            (line_number, self.parse(line_number, line))
+            for line_number, line in batch
+            if line.strip()
+        ]
+        self.resolve_authors(rows)
+        self.resolve_tags({name for _, data in rows for name in data.get("tags", [])})
+
+        posts = []
+        for _, data in rows:
+            post = Post(
+                author_id=self.authors[data["author"]],
+                **{field: data[field] for field in POST_FIELDS if field in data},
+            )
+            post.schedule()
+            post.render_body()
+            post.active_comment_count = sum(
+                comment.get("active", True) for comment in data.get("comments", [])
+            )
+            posts.append(post)
+        Post.objects.bulk_create(posts)
+
+        tagged_items = []
+        comments = []
+        for post, (_, data) in zip(posts, rows):
+            tagged_items += [
+                Post.tags.through(
+                    content_type=self.content_type,
+                    object_id=post.id,
+                    tag_id=self.tags[name],
+                )
+                for name in data.get("tags", [])
+            ]
+            comments += [
+                Comment(
+                    post=post,
+                    **{
+                        field: comment[field]
+                        for field in COMMENT_FIELDS
+                        if field in comment
+                    },
+                )
+                for comment in data.get("comments", [])
+            ]
+        Post.tags.through.objects.bulk_create(tagged_items)
+        refresh_tag_post_counts({item.tag_id for item in tagged_items})
+        Comment.objects.bulk_create(comments)
+
+        # bulk_create() stamps the auto_now fields, put the exported ones back.
+        self.restore_timestamps(posts, (data for _, data in rows))
+        self.restore_timestamps(
+            comments,
+            (comment for _, data in rows for comment in data.get("comments", [])),
+        )
+        return len(posts)
+
+    def restore_timestamps(self, objects: list, rows) -> None:
+        changed = []
+        for obj, data in zip(objects, rows):
+            if "created" in data or "updated" in data:
+                obj.created = data.get("created", obj.created)
+                obj.updated = data.get("updated", obj.updated)
+                changed.append(obj)
+        if changed:
+            type(changed[0]).objects.bulk_update(changed, fields=["created", "updated"])
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.moderation import moderate_pending
+
+
+class Command(BaseCommand):
+    help = "Run the pending comments through the moderation checks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for pending comments instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=10,
+            help="Seconds to wait between polls when no comment is pending.",
+        )
+
+    def handle(self, *args, **options):
+        total_approved = total_rejected = 0
+        while True:
+            approved, rejected = moderate_pending(batch_size=options["batch_size"])
+            total_approved += approved
+            total_rejected += rejected
+            if not approved and not rejected:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Approved {total_approved} comment(s), rejected {total_rejected}."
+            )
+        )
@@ -0,0 +1,46 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from blog.models import Post
+from replicas.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = "Publish the scheduled posts whose publish time has come."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep publishing due posts instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to wait between two runs when looping.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            total += self.publish_due()
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(self.style.SUCCESS(f"Published {total} post(s)."))
+
+    @use_primary()
+    def publish_due(self) -> int:
+        due = Post.objects.filter(
+            status=Post.Status.SCHEDULED, publish__lte=timezone.now()
+        )
+        published = 0
+        for post in due.iterator():
+            # save() flips the status and its receivers invalidate the caches,
+            # the sitemap pages, the tag counters and the similar posts.
+            post.save()
+            published += 1
+        return published
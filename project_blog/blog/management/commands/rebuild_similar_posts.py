@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from blog.similar import rebuild_all_similar_posts
+
+
+class Command(BaseCommand):
+    help = "Rebuild the similar posts relation of every published post."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        total = rebuild_all_similar_posts(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Stored {total} similar post(s)."))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, Q
+
+from blog.models import Post
+from replicas.routers import use_primary
+
+
+class Command(BaseCommand):
+    help = "Fix the posts whose active comment counter drifted from their comments."
+
+    @use_primary()
+    def handle(self, *args, **options):
+        drifted = (
+            Post.objects.annotate(
+                actual=Count("comments", filter=Q(comments__active=True))
+            )
+            .exclude(active_comment_count=F("actual"))
+            .values_list("id", flat=True)
+        )
+        fixed = Post.objects.filter(id__in=list(drifted)).update_active_comment_counts()
+        self.stdout.write(self.style.SUCCESS(f"Fixed {fixed} post counter(s)."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.tag_counts import refresh_tag_post_counts
+
+
+class Command(BaseCommand):
+    help = "Recount the published posts of every tag."
+
+    def handle(self, *args, **options):
+        refreshed = refresh_tag_post_counts()
+        self.stdout.write(self.style.SUCCESS(f"Refreshed {refreshed} tag counter(s)."))
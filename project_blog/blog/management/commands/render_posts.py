@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Render the markdown body of posts into the stored HTML body and excerpt."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Re-render every post, not only the ones without a rendered body.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only("id", "body")
+        if not options["all"]:
+            posts = posts.filter(body_html="")
+
+        batch_size = options["batch_size"]
+        batch = []
+        rendered = 0
+        for post in posts.iterator(chunk_size=batch_size):
+            post.render_body()
+            batch.append(post)
+            if len(batch) >= batch_size:
+                rendered += self.flush(batch)
+        rendered += self.flush(batch)
+        self.stdout.write(self.style.SUCCESS(f"Rendered {rendered} post(s)."))
+
+    def flush(self, batch: list[Post]) -> int:
+        Post.objects.bulk_update(batch, fields=["body_html", "excerpt_html"])
+        flushed = len(batch)
+        batch.clear()
+        return flushed
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.benchmark import seed
+
+
+class Command(BaseCommand):
+    help = "Fill the database with a reproducible set of posts, tags and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--posts", type=int, default=1000)
+        parser.add_argument("--tags", type=int, default=50)
+        parser.add_argument("--tags-per-post", type=int, default=3)
+        parser.add_argument("--comments-per-post", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        seed(
+            posts=options["posts"],
+            tags=options["tags"],
+            tags_per_post=options["tags_per_post"],
+            comments_per_post=options["comments_per_post"],
+            random_seed=options["seed"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Created {options['posts']} post(s)."))
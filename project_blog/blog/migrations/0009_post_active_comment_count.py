@@ -0,0 +1,39 @@
+# Generated by Django 6.0 on 2026-10-18 15:45
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def count_active_comments(apps, schema_editor):
+    Comment = apps.get_model("blog", "Comment")
+    Post = apps.get_model("blog", "Post")
+    active_comments = (
+        Comment.objects.filter(post=models.OuterRef("pk"), active=True)
+        .values("post")
+        .annotate(count=models.Count("id"))
+        .values("count")
+    )
+    Post.objects.update(
+        active_comment_count=Coalesce(models.Subquery(active_comments), 0)
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0008_similarpost"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="active_comment_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["-active_comment_count"], name="blog_post_active__762281_idx"
+            ),
+        ),
+        migrations.RunPython(count_active_comments, migrations.RunPython.noop),
+    ]
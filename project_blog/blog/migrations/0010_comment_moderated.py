@@ -0,0 +1,31 @@
+# Generated by Django 6.0 on 2026-10-18 15:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0009_post_active_comment_count"),
+    ]
+
+    operations = [
+        # Comments posted before moderation existed count as moderated.
+        migrations.AddField(
+            model_name="comment",
+            name="moderated",
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AlterField(
+            model_name="comment",
+            name="moderated",
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                condition=models.Q(("moderated", False)),
+                fields=["created"],
+                name="blog_comment_pending_idx",
+            ),
+        ),
+    ]
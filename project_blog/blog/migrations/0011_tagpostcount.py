@@ -0,0 +1,62 @@
+# Generated by Django 6.0 on 2026-10-18 15:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def count_tag_posts(apps, schema_editor):
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    Post = apps.get_model("blog", "Post")
+    TaggedItem = apps.get_model("taggit", "TaggedItem")
+    TagPostCount = apps.get_model("blog", "TagPostCount")
+    content_type = ContentType.objects.filter(app_label="blog", model="post").first()
+    if content_type is None:
+        return
+    counts = (
+        TaggedItem.objects.filter(
+            content_type=content_type,
+            object_id__in=Post.objects.filter(status="PB").values("id"),
+        )
+        .values("tag_id")
+        .annotate(count=models.Count("id"))
+        .values_list("tag_id", "count")
+    )
+    TagPostCount.objects.bulk_create(
+        [TagPostCount(tag_id=tag_id, count=count) for tag_id, count in counts]
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0010_comment_moderated"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        (
+            "taggit",
+            "0006_rename_taggeditem_content_type_object_id_taggit_tagg_content_8fc721_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TagPostCount",
+            fields=[
+                (
+                    "tag",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="post_count",
+                        serialize=False,
+                        to="taggit.tag",
+                    ),
+                ),
+                ("count", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["-count"], name="blog_tagpos_count_358e17_idx")
+                ],
+            },
+        ),
+        migrations.RunPython(count_tag_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 6.0 on 2026-10-18 15:57
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def schedule_future_posts(apps, schema_editor):
+    Post = apps.get_model("blog", "Post")
+    Post.objects.filter(status="PB", publish__gt=timezone.now()).update(status="SC")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("blog", "0011_tagpostcount"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="post",
+            name="blog_post_active__762281_idx",
+        ),
+        migrations.AlterField(
+            model_name="post",
+            name="status",
+            field=models.CharField(
+                choices=[("DF", "Draft"), ("PB", "Published"), ("SC", "Scheduled")],
+                default="DF",
+                max_length=2,
+            ),
+        ),
+        migrations.RunPython(schedule_future_posts, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", "PB")),
+                fields=["-publish", "-id"],
+                name="blog_post_published_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", "PB")),
+                fields=["-active_comment_count", "-publish"],
+                name="blog_post_most_commented_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                condition=models.Q(("status", "SC")),
+                fields=["publish"],
+                name="blog_post_scheduled_idx",
+            ),
+        ),
+    ]
@@ -1,26 +1,93 @@
 from django.conf import settings
-from django.db import models
-from django.utils import timezone
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    SearchVectorField,
+    TrigramSimilarity,
+)
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Now
+from django.template.defaultfilters import truncatewords_html
 from django.urls import reverse
-
+from django.utils import timezone
+from markdown import markdown
 from taggit.managers import TaggableManager
+from taggit.models import Tag
+
+from profiling.profiler import section
 
 # Create your models here.
 
+EXCERPT_WORDS = 30
+SEARCH_CONFIG = "english"
+
+
+class PostQuerySet(models.QuerySet):
+    def for_display(self):
+        """
+        Fetch the author and tags rendered along with every post on the list
+        and detail pages, so they don't cost a query per post.
+        """
+        return self.select_related("author").prefetch_related("tags")
+
+    def search(self, query: str):
+        """
+        Rank the posts matching the query in their title or body, or with a
+        title similar to it.
 
-class PublishedManager(models.Manager):
+        The full-text match is served by the GIN index on the stored search
+        vector and the fuzzy title match by the trigram GIN index on title.
+        """
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            self.filter(
+                models.Q(search_vector=search_query)
+                | models.Q(title__trigram_similar=query)
+            )
+            .annotate(
+                rank=SearchRank(models.F("search_vector"), search_query)
+                + TrigramSimilarity("title", query)
+            )
+            .order_by("-rank", "-publish")
+        )
+
+    def update_active_comment_counts(self) -> int:
+        """
+        Recompute the denormalized active comment counter of the posts.
+        """
+        active_comments = (
+            Comment.objects.filter(post=models.OuterRef("pk"), active=True)
+            .values("post")
+            .annotate(count=models.Count("id"))
+            .values("count")
+        )
+        return self.update(
+            active_comment_count=Coalesce(models.Subquery(active_comments), 0)
+        )
+
+
+class PublishedManager(models.Manager.from_queryset(PostQuerySet)):
     def get_queryset(self):
-        return super().get_queryset().filter(status=Post.Status.PUBLISHED)
+        return (
+            super()
+            .get_queryset()
+            .filter(status=Post.Status.PUBLISHED, publish__lte=Now())
+        )
 
 
 class Post(models.Model):
     class Status(models.TextChoices):
         DRAFT = "DF", "Draft"
         PUBLISHED = "PB", "Published"
+        SCHEDULED = "SC", "Scheduled"
 
     title = models.CharField(max_length=250)
     slug = models.SlugField(max_length=250, unique_for_date="publish")
     body = models.TextField()
+    body_html = models.TextField(blank=True, editable=False)
+    excerpt_html = models.TextField(blank=True, editable=False)
     status = models.CharField(max_length=2, choices=Status, default=Status.DRAFT)
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="blog_posts"
@@ -28,9 +95,17 @@ class Post(models.Model):
     publish = models.DateTimeField(default=timezone.now)
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
+    # Maintained by Comment, never written by Post.save().
+    active_comment_count = models.PositiveIntegerField(default=0, editable=False)
+    search_vector = models.GeneratedField(
+        expression=SearchVector("title", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("body", weight="B", config=SEARCH_CONFIG),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     # Model Managers
-    objects = models.Manager()  # The default manager
+    objects = PostQuerySet.as_manager()  # The default manager
     published = PublishedManager()  # Our custom manager
     tags = TaggableManager()  # Taggit manager
 
@@ -38,11 +113,122 @@ class Post(models.Model):
         ordering = ("-publish",)
         indexes = [
             models.Index(fields=["-publish"]),
+            # Published posts, the most recent first: the lists, feeds,
+            # sitemaps and the sidebar.
+            models.Index(
+                fields=["-publish", "-id"],
+                condition=models.Q(status="PB"),
+                name="blog_post_published_idx",
+            ),
+            models.Index(
+                fields=["-active_comment_count", "-publish"],
+                condition=models.Q(status="PB"),
+                name="blog_post_most_commented_idx",
+            ),
+            models.Index(
+                fields=["publish"],
+                condition=models.Q(status="SC"),
+                name="blog_post_scheduled_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="blog_post_search_vector_idx"),
+            GinIndex(
+                fields=["title"],
+                name="blog_post_title_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
         ]
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the values loaded from the database, so save() can tell
+        # which fields were changed.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def has_changed(self, field_name: str) -> bool:
+        """
+        Tell whether the field differs from the value last loaded from or saved
+        to the database. Always true for posts that were never saved.
+        """
+        if field_name in self.get_deferred_fields():
+            return False
+        loaded_values = getattr(self, "_loaded_values", {})
+        return field_name not in loaded_values or loaded_values[field_name] != getattr(
+            self, field_name
+        )
+
+    def needs_rendering(self) -> bool:
+        deferred_fields = self.get_deferred_fields()
+        if "body" in deferred_fields:
+            return False
+        if "body_html" not in deferred_fields and not self.body_html:
+            return True
+        return self.has_changed("body")
+
+    def render_body(self) -> None:
+        """
+        Render the markdown body into the stored HTML body and excerpt.
+        """
+        with section("markdown"):
+            self.body_html = markdown(text=self.body)
+        self.excerpt_html = truncatewords_html(self.body_html, EXCERPT_WORDS)
+
+    def schedule(self) -> bool:
+        """
+        Hold a published post with a future publish time as scheduled, and
+        publish a scheduled post once it is due. Return whether the status
+        changed.
+        """
+        now = timezone.now()
+        if self.status == self.Status.PUBLISHED and self.publish > now:
+            self.status = self.Status.SCHEDULED
+            return True
+        if self.status == self.Status.SCHEDULED and self.publish <= now:
+            self.status = self.Status.PUBLISHED
+            return True
+        return False
+
+    def save(self, *args, **kwargs):
+        deferred_fields = self.get_deferred_fields()
+        if kwargs.get("update_fields") is None and not self._state.adding:
+            # Don't overwrite the comment counter with a stale value.
+            kwargs["update_fields"] = {
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.name != "active_comment_count"
+                and field.attname not in deferred_fields
+            }
+        if not {"status", "publish"} & deferred_fields and self.schedule():
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "status"}
+        if self.needs_rendering():
+            self.render_body()
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "body_html", "excerpt_html"}
+        # post_save receivers still see the previously loaded values.
+        super().save(*args, **kwargs)
+        deferred_fields = self.get_deferred_fields()
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred_fields
+        }
+
+    def get_similar_posts(self, count: int = 4):
+        return (
+            Post.published.filter(similar_to__post=self)
+            .only("title", "slug", "publish")
+            .order_by("-similar_to__score", "-publish")[:count]
+        )
+
     def get_absolute_url(self):
         return reverse(
             viewname="blog:post_detail",
@@ -55,6 +241,60 @@ class Post(models.Model):
         )
 
 
+class SimilarPost(models.Model):
+    """
+    Materialized "similar posts" relation: the number of tags a published
+    post shares with another published post. Maintained by blog.similar.
+    """
+
+    post = models.ForeignKey(
+        to=Post,
+        on_delete=models.CASCADE,
+        related_name="similarities",
+    )
+    other = models.ForeignKey(
+        to=Post,
+        on_delete=models.CASCADE,
+        related_name="similar_to",
+    )
+    score = models.PositiveIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "other"], name="blog_similarpost_unique"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["post", "-score"]),
+        ]
+
+    def __str__(self):
+        return f"{self.other} is similar to {self.post} ({self.score})"
+
+
+class TagPostCount(models.Model):
+    """
+    Number of published posts carrying a tag. Maintained by blog.tag_counts.
+    """
+
+    tag = models.OneToOneField(
+        to=Tag,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="post_count",
+    )
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-count"]),
+        ]
+
+    def __str__(self):
+        return f"{self.tag} ({self.count})"
+
+
 class Comment(models.Model):
     post = models.ForeignKey(
         to=Post,
@@ -67,12 +307,39 @@ class Comment(models.Model):
     created = models.DateTimeField(auto_now_add=True)
     updated = models.DateTimeField(auto_now=True)
     active = models.BooleanField(default=True)
+    moderated = models.BooleanField(default=False)
 
     class Meta:
         ordering = ("created",)
         indexes = [
             models.Index(fields=["created"]),
+            models.Index(
+                fields=["created"],
+                condition=models.Q(moderated=False),
+                name="blog_comment_pending_idx",
+            ),
         ]
 
     def __str__(self):
         return f"Comment by {self.name} on {self.post}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_active = dict(zip(field_names, values)).get("active")
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep Post.active_comment_count in step within the same transaction.
+        with transaction.atomic(using=kwargs.get("using")):
+            was_active = getattr(self, "_loaded_active", False)
+            super().save(*args, **kwargs)
+            posts = Post.objects.filter(pk=self.post_id)
+            if was_active is None:
+                posts.update_active_comment_counts()
+            elif was_active != self.active:
+                delta = 1 if self.active else -1
+                posts.update(
+                    active_comment_count=models.F("active_comment_count") + delta
+                )
+        self._loaded_active = self.active
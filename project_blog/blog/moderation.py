@@ -0,0 +1,79 @@
+"""
+Comment moderation.
+
+Comments are stored pending (inactive and not moderated) by post_comment.
+The moderate_comments command runs every pending comment through the checks
+listed in BLOG_COMMENT_CHECKS and approves it unless one of them flags it.
+A check is a callable taking the comment and returning the reason to reject
+it, or None.
+"""
+
+import re
+from collections.abc import Callable, Iterable
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from blog import cache
+from blog.models import Comment, Post
+
+LINK_RE = re.compile(r"https?://|www\.", re.IGNORECASE)
+
+
+def too_many_links(comment: Comment) -> str | None:
+    if len(LINK_RE.findall(comment.body)) > settings.BLOG_COMMENT_MAX_LINKS:
+        return "Too many links."
+    return None
+
+
+def blocked_words(comment: Comment) -> str | None:
+    text = f"{comment.name} {comment.body}".lower()
+    for word in settings.BLOG_COMMENT_BLOCKED_WORDS:
+        if word.lower() in text:
+            return f"Contains {word!r}."
+    return None
+
+
+def get_checks() -> list[Callable[[Comment], str | None]]:
+    return [import_string(path) for path in settings.BLOG_COMMENT_CHECKS]
+
+
+def comments_changed(post_ids: Iterable[int]) -> None:
+    """
+    Refresh what depends on the active comments of the posts, after they were
+    changed in bulk, bypassing Comment.save() and the model signals.
+    """
+    posts = Post.objects.filter(id__in=set(post_ids))
+    posts.update_active_comment_counts()
+    cache.invalidate(cache.SIDEBAR)
+    for post in posts.only("publish", "slug"):
+        cache.invalidate_post_detail(post)
+
+
+def save_moderation(comments: list[Comment]) -> None:
+    """
+    Mark the comments moderated and store their active flag with a single
+    bulk update. bulk_update() skips auto_now, updated is set by hand since
+    the post detail ETag is derived from it.
+    """
+    now = timezone.now()
+    for comment in comments:
+        comment.moderated = True
+        comment.updated = now
+    Comment.objects.bulk_update(comments, fields=["active", "moderated", "updated"])
+    comments_changed(comment.post_id for comment in comments)
+
+
+def moderate_pending(batch_size: int = 100) -> tuple[int, int]:
+    """
+    Moderate a batch of pending comments, oldest first, and return the number
+    of comments approved and rejected.
+    """
+    checks = get_checks()
+    comments = list(Comment.objects.filter(moderated=False)[:batch_size])
+    for comment in comments:
+        comment.active = not any(check(comment) for check in checks)
+    save_moderation(comments)
+    approved = sum(comment.active for comment in comments)
+    return approved, len(comments) - approved
@@ -0,0 +1,147 @@
+"""
+Keyset (cursor) pagination for posts.
+
+Pages are sliced with a WHERE clause on the ``(publish, id)`` of the last row
+of the previous page instead of an OFFSET, so every page costs as much as the
+first one and no COUNT(*) is needed.
+"""
+
+import base64
+import binascii
+import json
+from collections.abc import Sequence
+from datetime import datetime
+
+from django.core.paginator import Paginator
+from django.db.models import Q, QuerySet
+
+FORWARD = "n"
+BACKWARD = "p"
+
+
+def encode_cursor(direction: str, publish: datetime, pk: int) -> str:
+    data = json.dumps([direction, publish.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, datetime, int] | None:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        direction, publish, pk = json.loads(data)
+        if direction not in (FORWARD, BACKWARD):
+            return None
+        return direction, datetime.fromisoformat(publish), int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+class CursorPage(Sequence):
+    def __init__(
+        self,
+        object_list: list,
+        paginator: "CursorPaginator",
+        has_next: bool,
+        has_previous: bool,
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<CursorPage of {len(self)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+    def has_previous(self) -> bool:
+        return self._has_previous
+
+    def has_other_pages(self) -> bool:
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self) -> str | None:
+        if not self._has_next or not self.object_list:
+            return None
+        last = self.object_list[-1]
+        return encode_cursor(FORWARD, last.publish, last.pk)
+
+    @property
+    def previous_cursor(self) -> str | None:
+        if not self._has_previous or not self.object_list:
+            return None
+        first = self.object_list[0]
+        return encode_cursor(BACKWARD, first.publish, first.pk)
+
+
+class CursorPaginator:
+    """
+    Paginate a queryset of posts ordered by ``-publish, -id``.
+    """
+
+    cursor_based = True
+
+    def __init__(self, object_list: QuerySet, per_page: int):
+        self.object_list = object_list
+        self.per_page = per_page
+
+    def get_page(self, cursor: str | None) -> CursorPage:
+        """
+        Return the page following (or preceding) the given cursor. Missing or
+        invalid cursors return the first page.
+        """
+        position = decode_cursor(cursor) if cursor else None
+        if position is None:
+            rows = list(
+                self.object_list.order_by("-publish", "-id")[: self.per_page + 1]
+            )
+            return CursorPage(
+                rows[: self.per_page],
+                paginator=self,
+                has_next=len(rows) > self.per_page,
+                has_previous=False,
+            )
+
+        direction, publish, pk = position
+        if direction == FORWARD:
+            rows = list(
+                self.object_list.filter(publish__lte=publish)
+                .filter(Q(publish__lt=publish) | Q(publish=publish, id__lt=pk))
+                .order_by("-publish", "-id")[: self.per_page + 1]
+            )
+            return CursorPage(
+                rows[: self.per_page],
+                paginator=self,
+                has_next=len(rows) > self.per_page,
+                has_previous=True,
+            )
+
+        rows = list(
+            self.object_list.filter(publish__gte=publish)
+            .filter(Q(publish__gt=publish) | Q(publish=publish, id__gt=pk))
+            .order_by("publish", "id")[: self.per_page + 1]
+        )
+        return CursorPage(
+            rows[: self.per_page][::-1],
+            paginator=self,
+            has_next=True,
+            has_previous=len(rows) > self.per_page,
+        )
+
+
+class CountedPaginator(Paginator):
+    """
+    Numbered paginator taking the number of objects from a maintained
+    counter instead of a COUNT(*) query.
+    """
+
+    def __init__(self, object_list: QuerySet, per_page: int, count: int, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count = count
@@ -0,0 +1,18 @@
+from django.core.cache import cache
+
+
+def is_rate_limited(key: str, limit: int, period: int) -> bool:
+    """
+    Count a hit on the key and tell whether it went over ``limit`` hits in the
+    current window of ``period`` seconds.
+    """
+    cache_key = f"blog:ratelimit:{key}"
+    if cache.add(cache_key, 1, timeout=period):
+        return False
+    try:
+        hits = cache.incr(cache_key)
+    except ValueError:
+        # The window expired between add() and incr().
+        cache.add(cache_key, 1, timeout=period)
+        return False
+    return hits > limit
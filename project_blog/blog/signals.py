@@ -0,0 +1,117 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from blog import cache
+from blog.models import Comment, Post
+from blog.similar import rebuild_similar_posts
+from blog.sitemaps import invalidate_post_pages
+from blog.tag_counts import refresh_tag_post_counts
+from replicas.routers import use_primary
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_sidebar(sender, **kwargs):
+    cache.invalidate(cache.SIDEBAR)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_search(sender, **kwargs):
+    cache.invalidate(cache.SEARCH)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feeds(sender, instance, **kwargs):
+    # Drafts never show up in the feeds, unless they were just unpublished.
+    loaded_status = getattr(instance, "_loaded_values", {}).get("status")
+    if Post.Status.PUBLISHED in (instance.status, loaded_status):
+        cache.invalidate(cache.FEED)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_post_details(sender, **kwargs):
+    # A post change can move its URL or alter the similar posts of others.
+    cache.invalidate(cache.POST_DETAIL)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_post_detail(sender, instance, **kwargs):
+    post = Post.objects.filter(pk=instance.post_id).only("publish", "slug").first()
+    if post is not None:
+        cache.invalidate_post_detail(post)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_similar_posts_on_tag_change(sender, instance, action, reverse, **kwargs):
+    if not reverse and action in ("post_add", "post_remove", "post_clear"):
+        rebuild_similar_posts(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_similar_posts_on_status_change(sender, instance, created, **kwargs):
+    # New posts have no tags yet, they are handled once their tags are added.
+    if not created and instance.has_changed("status"):
+        rebuild_similar_posts(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_active_comment_count(sender, instance, **kwargs):
+    # Sent within the transaction of the deletion.
+    if instance.active:
+        Post.objects.filter(pk=instance.post_id).update(
+            active_comment_count=F("active_comment_count") - 1
+        )
+
+
+@receiver(post_save, sender=Post)
+def invalidate_sitemap_on_save(sender, instance, **kwargs):
+    invalidate_post_pages(instance)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_sitemap_on_delete(sender, instance, **kwargs):
+    invalidate_post_pages(instance, deleted=True)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+@use_primary()
+def update_tag_post_counts_on_tag_change(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    if reverse or instance.status != Post.Status.PUBLISHED:
+        return
+    if action == "pre_clear":
+        # post_clear doesn't tell which tags were removed.
+        instance._cleared_tag_ids = list(instance.tags.values_list("id", flat=True))
+    elif action in ("post_add", "post_remove"):
+        refresh_tag_post_counts(pk_set)
+    elif action == "post_clear":
+        refresh_tag_post_counts(instance.__dict__.pop("_cleared_tag_ids", []))
+
+
+@receiver(post_save, sender=Post)
+@use_primary()
+def update_tag_post_counts_on_status_change(sender, instance, created, **kwargs):
+    # New posts have no tags yet, they are handled once their tags are added.
+    if not created and instance.has_changed("status"):
+        refresh_tag_post_counts(instance.tags.values_list("id", flat=True))
+
+
+@receiver(pre_delete, sender=Post)
+@use_primary()
+def collect_deleted_post_tags(sender, instance, **kwargs):
+    if instance.status == Post.Status.PUBLISHED:
+        instance._deleted_tag_ids = list(instance.tags.values_list("id", flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def update_tag_post_counts_on_delete(sender, instance, **kwargs):
+    refresh_tag_post_counts(instance.__dict__.pop("_deleted_tag_ids", []))
@@ -0,0 +1,62 @@
+"""
+Maintenance of the materialized "similar posts" relation.
+
+Every pair of published posts sharing at least one tag has a SimilarPost row
+in both directions, scored with the number of tags they share.
+"""
+
+from django.db import transaction
+from django.db.models import Count, Q
+
+from blog.models import Post, SimilarPost
+
+
+def shared_tag_counts(post: Post) -> list[tuple[int, int]]:
+    """
+    Return ``(post id, number of shared tags)`` for every other published
+    post sharing a tag with the given post.
+    """
+    post_tag_ids = post.tags.values_list("id", flat=True)
+    return list(
+        Post.published.filter(tags__in=post_tag_ids)
+        .exclude(id=post.id)
+        .annotate(score=Count("tags"))
+        .values_list("id", "score")
+    )
+
+
+@transaction.atomic
+def rebuild_similar_posts(post: Post) -> None:
+    """
+    Replace the similarities of a post, in both directions, after its tags or
+    its status changed.
+    """
+    SimilarPost.objects.filter(Q(post=post) | Q(other=post)).delete()
+    if post.status != Post.Status.PUBLISHED:
+        return
+    similarities = []
+    for other_id, score in shared_tag_counts(post):
+        similarities.append(SimilarPost(post=post, other_id=other_id, score=score))
+        similarities.append(SimilarPost(post_id=other_id, other=post, score=score))
+    SimilarPost.objects.bulk_create(similarities)
+
+
+@transaction.atomic
+def rebuild_all_similar_posts(batch_size: int = 1000) -> int:
+    """
+    Rebuild the whole relation from scratch and return the number of rows.
+    """
+    SimilarPost.objects.all().delete()
+    similarities = []
+    total = 0
+    for post in Post.published.only("id").iterator(chunk_size=batch_size):
+        similarities.extend(
+            SimilarPost(post=post, other_id=other_id, score=score)
+            for other_id, score in shared_tag_counts(post)
+        )
+        if len(similarities) >= batch_size:
+            SimilarPost.objects.bulk_create(similarities)
+            total += len(similarities)
+            similarities = []
+    SimilarPost.objects.bulk_create(similarities)
+    return total + len(similarities)
@@ -1,14 +1,96 @@
-from django.contrib.sitemaps import Sitemap
+from django.conf import settings
+from django.contrib.sitemaps import Sitemap, views
+from django.db.models import Max, Q
+from django.http import HttpRequest, HttpResponse
 
+from blog import cache
 from blog.models import Post
+from replicas.routers import use_primary
+
+SCHEMES = ["http", "https"]
 
 
 class PostSitemap(Sitemap):
     changefreq = "weekly"
     priority = 0.9
 
+    @property
+    def limit(self):
+        return settings.BLOG_SITEMAP_LIMIT
+
     def items(self):
-        return Post.published.all()
+        # Oldest first, so new posts only ever change the last page.
+        return Post.published.only("slug", "publish", "updated").order_by(
+            "publish", "id"
+        )
 
     def lastmod(self, obj):
         return obj.updated
+
+    def get_latest_lastmod(self):
+        return Post.published.aggregate(latest=Max("updated"))["latest"]
+
+    def page_of(self, post_id: int, publish) -> int:
+        position = Post.published.filter(
+            Q(publish__lt=publish) | Q(publish=publish, id__lt=post_id)
+        ).count()
+        return position // self.limit + 1
+
+
+sitemaps = {
+    "posts": PostSitemap,
+}
+
+
+def cached_response(parts: list, get_response) -> HttpResponse:
+    def render():
+        response = get_response()
+        response.render()
+        return {"content": response.content, "headers": dict(response.headers)}
+
+    cached = cache.get_or_set(cache.SITEMAP, parts, render)
+    return HttpResponse(cached["content"], headers=cached["headers"])
+
+
+def sitemap_index(request: HttpRequest) -> HttpResponse:
+    return cached_response(
+        ["index", request.scheme],
+        lambda: views.index(request, sitemaps=sitemaps),
+    )
+
+
+def sitemap(request: HttpRequest, section: str) -> HttpResponse:
+    try:
+        page = int(request.GET.get("p", 1))
+    except ValueError:
+        return views.sitemap(request, sitemaps=sitemaps, section=section)
+    return cached_response(
+        ["page", section, page, request.scheme],
+        lambda: views.sitemap(request, sitemaps=sitemaps, section=section),
+    )
+
+
+@use_primary()
+def invalidate_post_pages(post: Post, deleted: bool = False) -> None:
+    """
+    Drop the cached sitemap pages a post change affects: the page listing the
+    post, and when posts were added, removed or reordered, every page after it.
+    """
+    loaded_values = getattr(post, "_loaded_values", {})
+    was_published = loaded_values.get("status") == Post.Status.PUBLISHED
+    is_published = post.status == Post.Status.PUBLISHED and not deleted
+    if not (was_published or is_published):
+        return
+
+    site = PostSitemap()
+    publish_dates = {post.publish, loaded_values.get("publish", post.publish)}
+    first_page = min(site.page_of(post.pk, publish) for publish in publish_dates)
+    if was_published != is_published or len(publish_dates) > 1:
+        last_page = site.paginator.num_pages + 1
+    else:
+        last_page = first_page
+
+    parts_list = [["index", scheme] for scheme in SCHEMES]
+    for page in range(first_page, last_page + 1):
+        parts_list.extend(["page", "posts", page, scheme] for scheme in SCHEMES)
+    cache.delete_many(cache.SITEMAP, parts_list)
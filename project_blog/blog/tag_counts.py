@@ -0,0 +1,51 @@
+"""
+Maintenance of the per-tag published post counters.
+
+The counters of the tags touched by a change are recounted from the taggit
+through table, which only reads the rows of those tags. The counts are read from the
+primary, a lagging replica would store stale counters.
+"""
+
+from collections.abc import Iterable
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count
+from taggit.models import Tag
+
+from blog import cache
+from blog.models import Post, TagPostCount
+from replicas.routers import use_primary
+
+
+@use_primary()
+def refresh_tag_post_counts(tag_ids: Iterable[int] | None = None) -> int:
+    """
+    Recount the published posts of the given tags, or of every tag, and
+    return the number of counters stored.
+    """
+    if tag_ids is None:
+        tag_ids = Tag.objects.values_list("id", flat=True)
+    tag_ids = set(tag_ids)
+    if not tag_ids:
+        return 0
+    counts = dict(
+        Post.tags.through.objects.filter(
+            tag_id__in=tag_ids,
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id__in=Post.published.values("id"),
+        )
+        .values("tag_id")
+        .annotate(count=Count("id"))
+        .values_list("tag_id", "count")
+    )
+    TagPostCount.objects.bulk_create(
+        [
+            TagPostCount(tag_id=tag_id, count=counts.get(tag_id, 0))
+            for tag_id in tag_ids
+        ],
+        update_conflicts=True,
+        unique_fields=["tag"],
+        update_fields=["count"],
+    )
+    cache.invalidate(cache.SIDEBAR)
+    return len(tag_ids)
@@ -1,33 +1,82 @@
 from django import template
-from django.db.models import Count
 from django.utils.safestring import mark_safe
 from markdown import markdown
 
-from blog.models import Post
+from blog import cache
+from blog.models import Post, TagPostCount
+from profiling.profiler import section
 
 register = template.Library()
 
 
 @register.simple_tag
 def total_posts():
-    return Post.published.count()
+    return cache.get_or_set(cache.SIDEBAR, ["total_posts"], Post.published.count)
 
 
 @register.inclusion_tag(
     name="show_latest_posts", filename="blog/post/includes/latest_posts.html"
 )
 def latest_posts(count: int = 5):
-    latest_posts = Post.published.order_by("-publish")[:count]
+    latest_posts = cache.get_or_set(
+        cache.SIDEBAR,
+        ["latest_posts", count],
+        lambda: list(
+            Post.published.only("title", "slug", "publish").order_by("-publish")[:count]
+        ),
+    )
     return {"latest_posts": latest_posts}
 
 
 @register.simple_tag
 def get_most_commented_posts(count=5):
-    return Post.published.annotate(total_comments=Count("comments")).order_by(
-        "-total_comments"
-    )[:count]
+    return cache.get_or_set(
+        cache.SIDEBAR,
+        ["most_commented_posts", count],
+        lambda: list(
+            Post.published.only("title", "slug", "publish").order_by(
+                "-active_comment_count", "-publish"
+            )[:count]
+        ),
+    )
+
+
+def get_tag_cloud(count: int) -> list[dict]:
+    counters = list(
+        TagPostCount.objects.filter(count__gt=0)
+        .select_related("tag")
+        .order_by("-count")[:count]
+    )
+    if not counters:
+        return []
+    smallest, largest = counters[-1].count, counters[0].count
+    spread = max(largest - smallest, 1)
+    return sorted(
+        (
+            {
+                "name": counter.tag.name,
+                "slug": counter.tag.slug,
+                "count": counter.count,
+                # From 1 for the least used tag to 5 for the most used one.
+                "weight": 1 + round(4 * (counter.count - smallest) / spread),
+            }
+            for counter in counters
+        ),
+        key=lambda tag: tag["name"].lower(),
+    )
+
+
+@register.inclusion_tag(
+    name="show_tag_cloud", filename="blog/post/includes/tag_cloud.html"
+)
+def tag_cloud(count: int = 20):
+    tags = cache.get_or_set(
+        cache.SIDEBAR, ["tag_cloud", count], lambda: get_tag_cloud(count)
+    )
+    return {"tags": tags}
 
 
 @register.filter(name="markdown")
 def markdown_filter(text: str):
-    return mark_safe(markdown(text=text))
+    with section("markdown"):
+        return mark_safe(markdown(text=text))
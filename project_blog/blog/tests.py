@@ -1,3 +1,809 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connections
+from django.template import Context, Template
+from django.test import Client, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from blog import cache as blog_cache
+from blog.benchmark import measure, run_benchmark, seed
+from blog.models import Comment, Post, SimilarPost, TagPostCount
+from blog.pagination import CursorPaginator
+from blog.views import search_post_ids
+from mailqueue.models import OutboundEmail
+
+
+def create_post(author, **kwargs) -> Post:
+    fields = {
+        "title": "A post",
+        "slug": "a-post",
+        "body": "Some **markdown** body.",
+        "status": Post.Status.PUBLISHED,
+    }
+    fields.update(kwargs)
+    return Post.objects.create(author=author, **fields)
+
+
+class BlogTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_user(username="author")
+
+    def setUp(self):
+        cache.clear()
+
+
+class PostRenderingTests(BlogTestCase):
+    def test_body_is_rendered_on_create(self):
+        post = create_post(self.author)
+        self.assertEqual(post.body_html, "<p>Some <strong>markdown</strong> body.</p>")
+        self.assertEqual(post.excerpt_html, post.body_html)
+
+    def test_excerpt_is_truncated(self):
+        post = create_post(self.author, body=" ".join(["word"] * 50))
+        self.assertIn("word …", post.excerpt_html)
+
+    def test_body_is_rendered_again_only_when_changed(self):
+        post = Post.objects.get(pk=create_post(self.author).pk)
+        post.body_html = "stale"
+        post.title = "Another title"
+        post.save()
+        self.assertEqual(post.body_html, "stale")
+
+        post.body = "*changed*"
+        post.save(update_fields=["body"])
+        post.refresh_from_db()
+        self.assertEqual(post.body_html, "<p><em>changed</em></p>")
+
+    def test_render_posts_backfills_missing_html(self):
+        post = create_post(self.author)
+        Post.objects.filter(pk=post.pk).update(body_html="", excerpt_html="")
+        call_command("render_posts", stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.body_html, "<p>Some <strong>markdown</strong> body.</p>")
+
+
+class SidebarCacheTests(BlogTestCase):
+    template = Template(
+        "{% load blog_tags %}{% total_posts %}"
+        "{% show_latest_posts 3 %}"
+        "{% get_most_commented_posts as most_commented_posts %}"
+        "{% for post in most_commented_posts %}{{ post.title }}{% endfor %}"
+    )
+
+    def render(self) -> str:
+        return self.template.render(Context())
+
+    def test_sidebar_is_cached(self):
+        create_post(self.author)
+        with self.assertNumQueries(3):
+            self.render()
+        with self.assertNumQueries(0):
+            self.render()
+
+    def test_sidebar_is_invalidated_on_change(self):
+        post = create_post(self.author)
+        self.assertTrue(self.render().startswith("1"))
+
+        create_post(self.author, title="Second", slug="second")
+        self.assertTrue(self.render().startswith("2"))
+
+        Comment.objects.create(
+            post=post, name="reader", email="r@example.com", body="Hi"
+        )
+        with self.assertNumQueries(3):
+            self.render()
+
+        post.delete()
+        self.assertTrue(self.render().startswith("1"))
+
+
+class PostQueryCountTests(BlogTestCase):
+    def create_posts(self, count: int, tags: list[str]) -> list[Post]:
+        posts = []
+        for i in range(count):
+            post = create_post(self.author, title=f"Post {i}", slug=f"post-{i}")
+            post.tags.add(*tags)
+            posts.append(post)
+        return posts
+
+    def assertNumQueriesForGet(self, num: int, url: str):
+        # Warm up the sidebar cache, it is covered by SidebarCacheTests.
+        self.client.get(url)
+        with self.assertNumQueries(num):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+
+    def test_post_list(self):
+        self.create_posts(3, tags=["django", "python", "orm", "web"])
+        # Posts and tags.
+        self.assertNumQueriesForGet(2, reverse("blog:post_list"))
+
+    def test_post_list_by_tag(self):
+        self.create_posts(3, tags=["django", "python", "orm", "web"])
+        # Tag, posts and tags.
+        url = reverse("blog:post_list_by_tag", args=["django"])
+        self.assertNumQueriesForGet(3, url)
+
+    def test_post_detail(self):
+        post, *_ = self.create_posts(3, tags=["django", "python"])
+        for i in range(5):
+            Comment.objects.create(
+                post=post, name=f"reader {i}", email="r@example.com", body="Hi"
+            )
+        url = post.get_absolute_url()
+        self.client.get(url)
+        blog_cache.invalidate(blog_cache.POST_DETAIL)
+        # Post state, post, tags, comments and similar posts.
+        with self.assertNumQueries(5):
+            self.client.get(url)
+        # The cached page.
+        self.assertNumQueriesForGet(0, url)
+
+
+class CursorPaginationTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        publish = timezone.now()
+        # Posts 3 and 4 share their publish date, the id breaks the tie.
+        for i, days in enumerate([0, 1, 2, 3, 3, 4, 5]):
+            create_post(
+                cls.author,
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                publish=publish - timedelta(days=days),
+            )
+
+    def get_page(self, cursor: str | None = None):
+        paginator = CursorPaginator(Post.published.all(), per_page=3)
+        return paginator.get_page(cursor)
+
+    def titles(self, page) -> list[str]:
+        return [post.title for post in page]
+
+    def test_walk_forward_and_backward(self):
+        first = self.get_page()
+        self.assertEqual(self.titles(first), ["Post 0", "Post 1", "Post 2"])
+        self.assertFalse(first.has_previous())
+
+        second = self.get_page(first.next_cursor)
+        self.assertEqual(self.titles(second), ["Post 4", "Post 3", "Post 5"])
+
+        third = self.get_page(second.next_cursor)
+        self.assertEqual(self.titles(third), ["Post 6"])
+        self.assertFalse(third.has_next())
+
+        back = self.get_page(third.previous_cursor)
+        self.assertEqual(self.titles(back), self.titles(second))
+        back = self.get_page(back.previous_cursor)
+        self.assertEqual(self.titles(back), self.titles(first))
+        self.assertFalse(back.has_previous())
+
+    def test_invalid_cursor_returns_first_page(self):
+        self.assertEqual(
+            self.titles(self.get_page("not-a-cursor")), ["Post 0", "Post 1", "Post 2"]
+        )
+
+    def test_deep_page_costs_one_query(self):
+        cursor = self.get_page().next_cursor
+        with self.assertNumQueries(1):
+            self.get_page(cursor)
+
+    def test_post_list_links(self):
+        response = self.client.get(reverse("blog:post_list"))
+        next_cursor = response.context["posts"].next_cursor
+        self.assertContains(response, f'href="?cursor={next_cursor}"')
+
+
+class PostSearchTests(BlogTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        create_post(
+            cls.author, title="Django models", slug="models", body="Some *fields*."
+        )
+        create_post(cls.author, title="Templates", slug="templates", body="Models too.")
+        create_post(cls.author, title="Caching", slug="caching", body="Nothing.")
+
+    def search(self, query: str) -> list[str]:
+        return [post.title for post in Post.published.search(query)]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search("models"), ["Django models", "Templates"])
+
+    def test_similar_title(self):
+        self.assertEqual(self.search("cachng"), ["Caching"])
+
+    def test_search_view(self):
+        response = self.client.get(reverse("blog:post_search"), {"query": "models"})
+        self.assertContains(response, "Found 2 results")
+        self.assertContains(response, "<p>Some <em>fields</em>.</p>", html=True)
+
+    @override_settings(BLOG_SEARCH_MAX_RESULTS=2, BLOG_SEARCH_RESULTS_PER_PAGE=1)
+    def test_search_results_are_capped_and_paginated(self):
+        url = reverse("blog:post_search")
+        response = self.client.get(url, {"query": "models caching", "page": 2})
+        self.assertContains(response, "Found 2 results")
+        self.assertEqual(len(response.context["results"]), 1)
+        self.assertContains(response, 'href="?query=models+caching&amp;page=1"')
+
+    def test_search_results_are_cached_per_normalized_query(self):
+        self.assertEqual(search_post_ids("Models"), search_post_ids(" models  "))
+        with self.assertNumQueries(0):
+            search_post_ids("MODELS")
+
+        create_post(self.author, title="More models", slug="more-models")
+        self.assertEqual(len(search_post_ids("models")), 3)
+
+
+class SimilarPostTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_post(self.author, title="Post", slug="post")
+        self.post.tags.add("django", "python", "orm")
+        self.one_tag = create_post(self.author, title="One tag", slug="one-tag")
+        self.one_tag.tags.add("django")
+        self.two_tags = create_post(self.author, title="Two tags", slug="two-tags")
+        self.two_tags.tags.add("django", "orm")
+
+    def similar_titles(self, post: Post) -> list[str]:
+        return [similar.title for similar in post.get_similar_posts()]
+
+    def test_similar_posts_follow_tag_changes(self):
+        self.assertEqual(self.similar_titles(self.post), ["Two tags", "One tag"])
+        self.assertEqual(self.similar_titles(self.one_tag), ["Two tags", "Post"])
+
+        self.one_tag.tags.add("python", "orm")
+        self.assertEqual(self.similar_titles(self.post), ["One tag", "Two tags"])
+
+        self.post.tags.clear()
+        self.assertEqual(self.similar_titles(self.post), [])
+        self.assertEqual(self.similar_titles(self.two_tags), ["One tag"])
+
+    def test_similar_posts_follow_status_changes(self):
+        self.two_tags.status = Post.Status.DRAFT
+        self.two_tags.save()
+        self.assertEqual(self.similar_titles(self.post), ["One tag"])
+
+        self.two_tags.status = Post.Status.PUBLISHED
+        self.two_tags.save()
+        self.assertEqual(self.similar_titles(self.post), ["Two tags", "One tag"])
+
+    def test_rebuild_similar_posts_command(self):
+        SimilarPost.objects.all().delete()
+        call_command("rebuild_similar_posts", stdout=StringIO())
+        self.assertEqual(SimilarPost.objects.count(), 6)
+        self.assertEqual(self.similar_titles(self.post), ["Two tags", "One tag"])
+
+
+class CommentCounterTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_post(self.author)
+
+    def add_comment(self, **kwargs) -> Comment:
+        return Comment.objects.create(
+            post=self.post, name="reader", email="r@example.com", body="Hi", **kwargs
+        )
+
+    def assertCounter(self, expected: int):
+        self.post.refresh_from_db(fields=["active_comment_count"])
+        self.assertEqual(self.post.active_comment_count, expected)
+
+    def test_counter_follows_comments(self):
+        comment = self.add_comment()
+        self.add_comment(active=False)
+        self.assertCounter(1)
+
+        comment.active = False
+        comment.save()
+        self.assertCounter(0)
+
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.active = True
+        comment.save()
+        comment.save()
+        self.assertCounter(1)
+
+        comment.delete()
+        self.assertCounter(0)
+
+    def test_post_save_does_not_overwrite_counter(self):
+        post = Post.objects.get(pk=self.post.pk)
+        self.add_comment()
+        post.title = "New title"
+        post.save()
+        self.assertCounter(1)
+
+    def test_reconcile_comment_counts(self):
+        self.add_comment()
+        Post.objects.update(active_comment_count=5)
+        out = StringIO()
+        call_command("reconcile_comment_counts", stdout=out)
+        self.assertIn("Fixed 1 post counter(s).", out.getvalue())
+        self.assertCounter(1)
+
+
+class PostDetailCacheTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_post(self.author)
+        self.url = self.post.get_absolute_url()
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+        self.assertTrue(etag.startswith('W/"'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            self.url, headers={"If-Modified-Since": last_modified}
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_comment_invalidates_page(self):
+        etag = self.client.get(self.url).headers["ETag"]
+        Comment.objects.create(
+            post=self.post, name="reader", email="r@example.com", body="First!"
+        )
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertContains(response, "First!")
+        self.assertNotEqual(response.headers["ETag"], etag)
+
+    def test_post_change_invalidates_page(self):
+        self.client.get(self.url)
+        self.post.body = "Rewritten."
+        self.post.save()
+        self.assertContains(self.client.get(self.url), "Rewritten.")
+
+    def test_missing_post(self):
+        self.post.status = Post.Status.DRAFT
+        self.post.save()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+
+class FeedCacheTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_post(self.author, body="First *paragraph*.")
+        self.url = reverse("blog:post_feed")
+
+    def test_feed_is_cached(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertContains(response, "First &lt;em&gt;paragraph&lt;/em&gt;.")
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        etag = response.headers["ETag"]
+        response = self.client.get(self.url, headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 304)
+        response = self.client.get(
+            self.url,
+            headers={"If-Modified-Since": response.headers["Last-Modified"]},
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_feed_is_invalidated_by_published_posts_only(self):
+        self.client.get(self.url)
+        create_post(self.author, slug="draft", status=Post.Status.DRAFT)
+        with self.assertNumQueries(0):
+            self.client.get(self.url)
+
+        create_post(self.author, title="Second post", slug="second")
+        self.assertContains(self.client.get(self.url), "Second post")
+
+    @override_settings(BLOG_FEED_ITEMS=1)
+    def test_full_content_feed(self):
+        create_post(self.author, title="Second post", slug="second")
+        response = self.client.get(reverse("blog:post_feed_full"))
+        self.assertContains(response, "<item>", count=1)
+        self.assertContains(response, "Second post")
+
+
+@override_settings(BLOG_SITEMAP_LIMIT=2)
+class SitemapTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        publish = timezone.now() - timedelta(days=10)
+        self.posts = [
+            create_post(
+                self.author,
+                title=f"Post {i}",
+                slug=f"post-{i}",
+                publish=publish + timedelta(days=i),
+            )
+            for i in range(5)
+        ]
+
+    def get_page(self, page: int):
+        return self.client.get("/sitemap-posts.xml", {"p": page})
+
+    def test_index_lists_pages(self):
+        response = self.client.get("/sitemap.xml")
+        self.assertContains(response, "<sitemap>", count=3)
+        self.assertContains(response, "/sitemap-posts.xml?p=3")
+
+    def test_pages_are_cached(self):
+        self.assertContains(self.get_page(1), "/post-0/")
+        with self.assertNumQueries(0):
+            self.assertContains(self.get_page(1), "/post-0/")
+
+    def test_editing_a_post_invalidates_its_page_only(self):
+        self.get_page(1)
+        self.get_page(2)
+        post = self.posts[2]
+        post.slug = "renamed"
+        post.save()
+        with self.assertNumQueries(0):
+            self.get_page(1)
+        self.assertContains(self.get_page(2), "/renamed/")
+
+    def test_new_post_invalidates_following_pages(self):
+        self.get_page(3)
+        create_post(self.author, title="New", slug="new")
+        self.assertContains(self.get_page(3), "/new/")
+
+    def test_generate_sitemaps(self):
+        with TemporaryDirectory() as output_dir:
+            call_command("generate_sitemaps", output_dir, stdout=StringIO())
+            files = sorted(path.name for path in Path(output_dir).iterdir())
+            index = (Path(output_dir) / "sitemap.xml").read_text()
+        self.assertEqual(
+            files,
+            [
+                "sitemap-posts-1.xml",
+                "sitemap-posts-2.xml",
+                "sitemap-posts-3.xml",
+                "sitemap.xml",
+            ],
+        )
+        self.assertIn("https://example.com/sitemap-posts-3.xml", index)
+
+
+@override_settings(EMAIL_BACKEND="mailqueue.backends.QueuedEmailBackend")
+class PostShareTests(BlogTestCase):
+    def test_share_only_enqueues_the_email(self):
+        post = create_post(self.author)
+        response = self.client.post(
+            reverse("blog:post_share", args=[post.id]),
+            {"name": "Reader", "email": "r@example.com", "to": "friend@example.com"},
+        )
+        self.assertContains(response, "was successfully sent")
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.to, ["friend@example.com"])
+
+
+@override_settings(
+    BLOG_COMMENT_MODERATION=True,
+    BLOG_COMMENT_BLOCKED_WORDS=["casino"],
+    BLOG_COMMENT_RATE_LIMITS={"ip": (2, 60), "post": (30, 60)},
+)
+class CommentModerationTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_post(self.author)
+        self.url = reverse("blog:post_comment", args=[self.post.id])
+
+    def comment(self, body: str = "Nice post."):
+        return self.client.post(
+            self.url, {"name": "Reader", "email": "r@example.com", "body": body}
+        )
+
+    def moderate(self) -> str:
+        out = StringIO()
+        call_command("moderate_comments", stdout=out)
+        return out.getvalue()
+
+    def test_new_comments_wait_for_moderation(self):
+        self.assertContains(self.comment(), "awaiting moderation")
+        comment = Comment.objects.get()
+        self.assertFalse(comment.active)
+        self.assertFalse(comment.moderated)
+        self.assertNotContains(
+            self.client.get(self.post.get_absolute_url()), "Nice post."
+        )
+
+    def test_moderate_comments(self):
+        self.comment()
+        self.comment("Visit my casino!")
+        # Cache the page, and its ETag, before the moderation.
+        response = self.client.get(self.post.get_absolute_url())
+        self.assertNotContains(response, "Nice post.")
+        etag = response["ETag"]
+        self.assertIn("Approved 1 comment(s), rejected 1.", self.moderate())
+        self.assertQuerySetEqual(
+            Comment.objects.values_list("active", "moderated"),
+            [(True, True), (False, True)],
+        )
+        self.post.refresh_from_db(fields=["active_comment_count"])
+        self.assertEqual(self.post.active_comment_count, 1)
+        response = self.client.get(
+            self.post.get_absolute_url(), headers={"if-none-match": etag}
+        )
+        self.assertContains(response, "Nice post.")
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertIn("Approved 0 comment(s), rejected 0.", self.moderate())
+
+    @override_settings(BLOG_COMMENT_MAX_LINKS=1)
+    def test_too_many_links(self):
+        self.comment("See https://a.example and www.b.example")
+        self.moderate()
+        self.assertFalse(Comment.objects.get().active)
+
+    def test_rate_limit(self):
+        self.assertEqual(self.comment().status_code, 200)
+        self.assertEqual(self.comment().status_code, 200)
+        response = self.comment()
+        self.assertContains(response, "commenting too fast", status_code=429)
+        self.assertEqual(Comment.objects.count(), 2)
+
+    def test_admin_actions(self):
+        self.comment()
+        admin = get_user_model().objects.create_superuser(username="admin")
+        self.client.force_login(admin)
+        changelist = reverse("admin:blog_comment_changelist")
+        comment = Comment.objects.get()
+        self.client.post(
+            changelist, {"action": "approve", "_selected_action": [comment.pk]}
+        )
+        comment.refresh_from_db()
+        self.assertTrue(comment.active)
+        self.assertTrue(comment.moderated)
+        self.post.refresh_from_db(fields=["active_comment_count"])
+        self.assertEqual(self.post.active_comment_count, 1)
+
+        self.client.post(
+            changelist, {"action": "reject", "_selected_action": [comment.pk]}
+        )
+        comment.refresh_from_db()
+        self.assertFalse(comment.active)
+        self.post.refresh_from_db(fields=["active_comment_count"])
+        self.assertEqual(self.post.active_comment_count, 0)
+
+
+class ImportExportTests(BlogTestCase):
+    def test_round_trip(self):
+        post = create_post(self.author, publish=timezone.now() - timedelta(days=3))
+        post.tags.add("django", "python")
+        Comment.objects.create(
+            post=post, name="reader", email="r@example.com", body="Hi", moderated=True
+        )
+        Comment.objects.create(
+            post=post, name="spammer", email="s@example.com", body="Spam", active=False
+        )
+        create_post(self.author, title="Draft", slug="draft", status=Post.Status.DRAFT)
+
+        with TemporaryDirectory() as output_dir:
+            path = Path(output_dir) / "posts.jsonl"
+            call_command("export_posts", str(path), chunk_size=1, stderr=StringIO())
+            self.assertEqual(len(path.read_text().splitlines()), 2)
+            Post.objects.all().delete()
+            existing = create_post(self.author, title="Existing", slug="existing")
+            existing.tags.add("django")
+
+            out = StringIO()
+            with self.assertNumQueries(22):
+                call_command("import_posts", str(path), batch_size=1, stdout=out)
+        self.assertIn("Imported 2 post(s).", out.getvalue())
+
+        imported = Post.objects.get(slug="a-post")
+        self.assertEqual(imported.publish, post.publish)
+        self.assertEqual(imported.created, post.created)
+        self.assertEqual(imported.body_html, post.body_html)
+        self.assertEqual(imported.active_comment_count, 1)
+        self.assertEqual(sorted(imported.tags.names()), ["django", "python"])
+        self.assertQuerySetEqual(
+            imported.comments.values_list("name", "active", "moderated"),
+            [("reader", True, True), ("spammer", False, False)],
+        )
+        self.assertEqual(Post.objects.get(slug="draft").status, Post.Status.DRAFT)
+        self.assertQuerySetEqual(
+            SimilarPost.objects.values_list("post", "other", "score"),
+            [(imported.id, existing.id, 1), (existing.id, imported.id, 1)],
+            ordered=False,
+        )
+
+    def test_unknown_author(self):
+        with TemporaryDirectory() as input_dir:
+            path = Path(input_dir) / "posts.jsonl"
+            path.write_text('{"title": "T", "slug": "t", "body": "B", "author": "x"}\n')
+            with self.assertRaisesMessage(CommandError, "Line 1: unknown author 'x'."):
+                call_command("import_posts", str(path))
+        self.assertFalse(Post.objects.exists())
+
+
+class BenchmarkTests(BlogTestCase):
+    def test_seed_and_run(self):
+        seed(posts=10, tags=5, comments_per_post=2, random_seed=1)
+        self.assertEqual(Post.published.count(), 10)
+        self.assertTrue(Comment.objects.exists())
+
+        results = run_benchmark(requests=3)
+        self.assertEqual(
+            set(results),
+            {
+                "post_list",
+                "post_list_by_tag",
+                "post_detail",
+                "post_search",
+                "feed",
+                "sitemap_index",
+                "sitemap",
+            },
+        )
+        for result in results.values():
+            self.assertEqual(result["requests"], 3)
+            self.assertLessEqual(result["p50_ms"], result["p99_ms"])
+        # The second request to the feed is served from the cache.
+        self.assertEqual(results["feed"]["max_queries"], 2)
+        self.assertEqual(results["feed"]["mean_queries"], 0.67)
+
+
+class BenchmarkReplicaTests(TransactionTestCase):
+    databases = {"default", "replica"}
+
+    def test_queries_on_the_replica_are_counted(self):
+        author = get_user_model().objects.create_user(username="author")
+        create_post(author)
+        cache.clear()
+        result = measure(Client(), [reverse("blog:post_list")], 2, cache.clear)
+        self.assertGreater(result["mean_queries"], 0)
+
+
+class ReplicaMaintenanceTests(TransactionTestCase):
+    """
+    The maintenance paths run outside of a request and of a transaction,
+    their reads must not go to a lagging replica.
+    """
+
+    databases = {"default", "replica"}
+
+    def test_publish_scheduled_reads_from_the_primary(self):
+        author = get_user_model().objects.create_user(username="author")
+        post = create_post(
+            author,
+            status=Post.Status.SCHEDULED,
+            publish=timezone.now() - timedelta(minutes=1),
+        )
+        post.tags.add("django", "python")
+        with CaptureQueriesContext(connections["replica"]) as replica:
+            call_command("publish_scheduled", stdout=StringIO())
+            call_command("reconcile_tag_counts", stdout=StringIO())
+            call_command("reconcile_comment_counts", stdout=StringIO())
+        self.assertEqual(replica.captured_queries, [])
+        self.assertEqual(
+            dict(TagPostCount.objects.values_list("tag__name", "count")),
+            {"django": 1, "python": 1},
+        )
+
+
+class TagPostCountTests(BlogTestCase):
+    def counts(self) -> dict[str, int]:
+        return dict(
+            TagPostCount.objects.filter(count__gt=0).values_list("tag__name", "count")
+        )
+
+    def test_counters_follow_posts_and_tags(self):
+        post = create_post(self.author)
+        post.tags.add("django", "python")
+        other = create_post(self.author, slug="other")
+        other.tags.add("django")
+        draft = create_post(self.author, slug="draft", status=Post.Status.DRAFT)
+        draft.tags.add("django", "orm")
+        self.assertEqual(self.counts(), {"django": 2, "python": 1})
+
+        post.tags.remove("python")
+        self.assertEqual(self.counts(), {"django": 2})
+        other.tags.clear()
+        self.assertEqual(self.counts(), {"django": 1})
+
+        draft.status = Post.Status.PUBLISHED
+        draft.save()
+        self.assertEqual(self.counts(), {"django": 2, "orm": 1})
+        post.status = Post.Status.DRAFT
+        post.save()
+        self.assertEqual(self.counts(), {"django": 1, "orm": 1})
+        draft.delete()
+        self.assertEqual(self.counts(), {})
+
+    def test_reconcile_tag_counts(self):
+        create_post(self.author).tags.add("django")
+        TagPostCount.objects.update(count=7)
+        out = StringIO()
+        call_command("reconcile_tag_counts", stdout=out)
+        self.assertIn("Refreshed 1 tag counter(s).", out.getvalue())
+        self.assertEqual(self.counts(), {"django": 1})
+
+    def test_tag_cloud(self):
+        for i in range(3):
+            create_post(self.author, slug=f"post-{i}").tags.add(
+                *["django", "python", "orm"][: i + 1]
+            )
+        template = Template("{% load blog_tags %}{% show_tag_cloud %}")
+        content = template.render(Context())
+        self.assertInHTML(
+            '<a href="/blog/tag/django/" class="weight-5" title="3 posts">django</a>',
+            content,
+        )
+        self.assertInHTML(
+            '<a href="/blog/tag/orm/" class="weight-1" title="1 post">orm</a>', content
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(template.render(Context()), content)
+
+        create_post(self.author, slug="post-3").tags.add("orm")
+        self.assertInHTML(
+            '<a href="/blog/tag/orm/" class="weight-1" title="2 posts">orm</a>',
+            template.render(Context()),
+        )
+
+    @override_settings(BLOG_PAGINATION="numbered")
+    def test_tag_pages_use_the_counter(self):
+        for i in range(4):
+            create_post(self.author, slug=f"post-{i}").tags.add("django")
+        url = reverse("blog:post_list_by_tag", args=["django"])
+        self.client.get(url)
+        # Tag with its counter, posts and tags, no COUNT(*).
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertContains(response, "Page 1 of 2.")
+
+
+class ScheduledPublishingTests(BlogTestCase):
+    def setUp(self):
+        super().setUp()
+        self.post = create_post(
+            self.author, publish=timezone.now() + timedelta(hours=1)
+        )
+        self.post.tags.add("django")
+
+    def publish_scheduled(self) -> str:
+        out = StringIO()
+        call_command("publish_scheduled", stdout=out)
+        return out.getvalue()
+
+    def test_future_posts_are_scheduled(self):
+        self.assertEqual(self.post.status, Post.Status.SCHEDULED)
+        self.assertFalse(Post.published.exists())
+        self.assertEqual(self.client.get(self.post.get_absolute_url()).status_code, 404)
+        self.assertNotContains(self.client.get(reverse("blog:post_list")), "A post")
+        self.assertFalse(TagPostCount.objects.filter(count__gt=0).exists())
+
+    def test_rescheduling_a_published_post(self):
+        post = create_post(self.author, slug="published")
+        post.publish = timezone.now() + timedelta(days=1)
+        post.save(update_fields=["publish"])
+        post.refresh_from_db()
+        self.assertEqual(post.status, Post.Status.SCHEDULED)
+
+    def test_publish_scheduled(self):
+        self.assertContains(self.client.get(reverse("blog:post_feed")), "<rss")
+        self.assertIn("Published 0 post(s).", self.publish_scheduled())
+
+        Post.objects.filter(pk=self.post.pk).update(
+            publish=timezone.now() - timedelta(minutes=1)
+        )
+        self.assertIn("Published 1 post(s).", self.publish_scheduled())
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.status, Post.Status.PUBLISHED)
+        self.assertContains(self.client.get(reverse("blog:post_feed")), "A post")
+        self.assertContains(self.client.get(reverse("blog:post_list")), "A post")
+        self.assertEqual(self.client.get(self.post.get_absolute_url()).status_code, 200)
+        self.assertEqual(TagPostCount.objects.get(tag__name="django").count, 1)
@@ -1,14 +1,14 @@
 from django.urls import path
 
+from blog.feeds import FullPostsFeed, LatestPostsFeed
 from blog.views import (
-    post_detail,
-    post_list,
     PostListView,
-    post_share,
     post_comment,
+    post_detail,
+    post_list,
     post_search,
+    post_share,
 )
-from blog.feeds import LatestPostsFeed
 
 app_name = "blog"
 
@@ -22,5 +22,6 @@ urlpatterns = [
     path("<int:post_id>/share/", post_share, name="post_share"),
     path("<int:post_id>/comment/", post_comment, name="post_comment"),
     path("feed/", LatestPostsFeed(), name="post_feed"),
+    path("feed/full/", FullPostsFeed(), name="post_feed_full"),
     path("search/", post_search, name="post_search"),
 ]
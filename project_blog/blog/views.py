@@ -1,42 +1,53 @@
-from django.shortcuts import render, get_object_or_404
-from django.http import Http404, HttpRequest, HttpResponse
+import hashlib
+
+from django.conf import settings
+from django.core.mail import send_mail
 from django.core.paginator import Paginator
+from django.db.models import Max
+from django.http import Http404, HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.template.loader import render_to_string
+from django.views.decorators.http import condition, require_POST
 from django.views.generic import ListView
-from django.core.mail import send_mail
-from django.views.decorators.http import require_POST
 from taggit.models import Tag
-from django.db.models import Count
-from django.contrib.postgres.search import (
-    SearchVector,
-    SearchQuery,
-    SearchRank,
-    TrigramSimilarity,
-)
 
+from blog import cache
+from blog.forms import CommentForm, EmailPostForm, SearchForm
 from blog.models import Post
-from blog.forms import EmailPostForm, CommentForm, SearchForm
-
+from blog.pagination import CountedPaginator, CursorPaginator
+from blog.ratelimit import is_rate_limited
 
 # Create your views here.
 
 
 class PostListView(ListView):
-    queryset = Post.published.all()
+    queryset = Post.published.for_display()
     context_object_name = "posts"
     paginate_by = 3
     template_name = "blog/post/list.html"
 
 
 def post_list(request: HttpRequest, tag_slug: None | str = None) -> HttpResponse:
-    post_list = Post.published.all()
+    post_list = Post.published.for_display()
     tag = None
     if tag_slug:
-        tag = get_object_or_404(klass=Tag, slug=tag_slug)
-        post_list = post_list.filter(tags__in=[tag])
-
-    paginator = Paginator(object_list=post_list, per_page=3)
-    page_number = request.GET.get("page", default=1)
-    posts = paginator.get_page(number=page_number)
+        tag = get_object_or_404(
+            klass=Tag.objects.select_related("post_count"), slug=tag_slug
+        )
+        post_list = post_list.filter(tags=tag)
+
+    if settings.BLOG_PAGINATION == "cursor":
+        paginator = CursorPaginator(object_list=post_list, per_page=3)
+        posts = paginator.get_page(cursor=request.GET.get("cursor"))
+    else:
+        if tag is not None and hasattr(tag, "post_count"):
+            paginator = CountedPaginator(
+                object_list=post_list, per_page=3, count=tag.post_count.count
+            )
+        else:
+            paginator = Paginator(object_list=post_list, per_page=3)
+        page_number = request.GET.get("page", default=1)
+        posts = paginator.get_page(number=page_number)
     return render(
         request=request,
         template_name="blog/post/list.html",
@@ -44,41 +55,95 @@ def post_list(request: HttpRequest, tag_slug: None | str = None) -> HttpResponse
     )
 
 
+def get_post_detail_state(year: int, month: int, day: int, slug: str) -> dict | None:
+    """
+    Return the id and validators of a published post, or None when it doesn't
+    exist. Cached until the post or one of its comments changes.
+    """
+
+    def get_state():
+        state = (
+            Post.published.filter(
+                publish__year=year, publish__month=month, publish__day=day, slug=slug
+            )
+            .annotate(comments_updated=Max("comments__updated"))
+            .values("id", "updated", "comments_updated")
+            .first()
+        )
+        if state is None:
+            # Cache misses too, None would not be stored.
+            return {}
+        last_modified = max(filter(None, [state["updated"], state["comments_updated"]]))
+        return {
+            "id": state["id"],
+            "etag": f"{state['id']}-{last_modified.timestamp()}",
+            "last_modified": last_modified,
+        }
+
+    parts = cache.post_detail_parts(year, month, day, slug)
+    return cache.get_or_set(cache.POST_DETAIL, parts, get_state) or None
+
+
+def post_detail_etag(request, year, month, day, post) -> str | None:
+    state = get_post_detail_state(year, month, day, post)
+    # The page embeds a CSRF token, so it is only weakly equal to another one.
+    return state and f'W/"{state["etag"]}"'
+
+
+def post_detail_last_modified(request, year, month, day, post):
+    state = get_post_detail_state(year, month, day, post)
+    return state and state["last_modified"]
+
+
+def render_post_detail(post_id: int) -> dict:
+    """
+    Render the part of the detail page shared by every visitor: everything
+    but the comment form, which embeds the CSRF token.
+    """
+    post = Post.published.for_display().get(id=post_id)
+    content = render_to_string(
+        template_name="blog/post/includes/post_detail.html",
+        context={
+            "post": post,
+            "comments": list(post.comments.filter(active=True)),
+            "similar_posts": post.get_similar_posts(count=4),
+        },
+    )
+    return {
+        "post": Post(
+            id=post.id, title=post.title, slug=post.slug, publish=post.publish
+        ),
+        "content": content,
+    }
+
+
+@condition(etag_func=post_detail_etag, last_modified_func=post_detail_last_modified)
 def post_detail(
     request: HttpRequest, year: int, month: int, day: int, post: str
 ) -> HttpResponse:
-    post = get_object_or_404(
-        klass=Post,
-        publish__year=year,
-        publish__month=month,
-        publish__day=day,
-        slug=post,
-        status=Post.Status.PUBLISHED,
+    state = get_post_detail_state(year, month, day, post)
+    if state is None:
+        raise Http404("No Post matches the given query.")
+    page = cache.get_or_set(
+        cache.POST_DETAIL,
+        ["page", state["etag"]],
+        lambda: render_post_detail(state["id"]),
     )
-    comments = post.comments.filter(active=True)
     form = CommentForm()
 
-    post_tag_ids = post.tags.values_list("id", flat=True)
-    similar_posts = Post.published.filter(tags__in=post_tag_ids).exclude(id=post.id)
-    similar_posts = similar_posts.annotate(same_tags=Count("tags")).order_by(
-        "-same_tags",
-        "-publish",
-    )[:4]
-
     return render(
         request=request,
         template_name="blog/post/detail.html",
         context={
-            "post": post,
-            "comments": comments,
+            "post": page["post"],
+            "content": page["content"],
             "form": form,
-            "similar_posts": similar_posts,
         },
     )
 
 
 def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
-    post = get_object_or_404(klass=Post, id=post_id, status=Post.Status.PUBLISHED)
+    post = get_object_or_404(klass=Post.published, id=post_id)
     sent = False
     if request.method == "POST":
         form = EmailPostForm(request.POST)
@@ -101,14 +166,40 @@ def post_share(request: HttpRequest, post_id: int) -> HttpResponse:
     )
 
 
+def comment_rate_limited(request: HttpRequest, post: Post) -> bool:
+    ip_limit, ip_period = settings.BLOG_COMMENT_RATE_LIMITS["ip"]
+    post_limit, post_period = settings.BLOG_COMMENT_RATE_LIMITS["post"]
+    # Count the hit against both limits.
+    return any(
+        [
+            is_rate_limited(
+                f"comment:ip:{request.META.get('REMOTE_ADDR')}", ip_limit, ip_period
+            ),
+            is_rate_limited(f"comment:post:{post.id}", post_limit, post_period),
+        ]
+    )
+
+
 @require_POST
 def post_comment(request: HttpRequest, post_id: int) -> HttpResponse:
-    post = get_object_or_404(klass=Post, id=post_id, status=Post.Status.PUBLISHED)
+    post = get_object_or_404(klass=Post.published, id=post_id)
     comment = None
     form = CommentForm(data=request.POST)
+    if comment_rate_limited(request, post):
+        return render(
+            request=request,
+            template_name="blog/post/comment.html",
+            context={"post": post, "form": form, "rate_limited": True},
+            status=429,
+        )
     if form.is_valid():
         comment = form.save(commit=False)
         comment.post = post
+        if settings.BLOG_COMMENT_MODERATION:
+            # Pending until the moderate_comments command reviews it.
+            comment.active = False
+        else:
+            comment.moderated = True
         comment.save()
     return render(
         request=request,
@@ -117,6 +208,25 @@ def post_comment(request: HttpRequest, post_id: int) -> HttpResponse:
     )
 
 
+def search_post_ids(query: str) -> list[int]:
+    """
+    Return the ids of the best ranked posts for the query, capped at
+    BLOG_SEARCH_MAX_RESULTS and cached for a short while per normalized query.
+    """
+    normalized_query = " ".join(query.lower().split())
+    query_hash = hashlib.sha256(normalized_query.encode()).hexdigest()
+    return cache.get_or_set(
+        cache.SEARCH,
+        [query_hash],
+        lambda: list(
+            Post.published.search(normalized_query).values_list("id", flat=True)[
+                : settings.BLOG_SEARCH_MAX_RESULTS
+            ]
+        ),
+        timeout=settings.BLOG_SEARCH_CACHE_TIMEOUT,
+    )
+
+
 def post_search(request: HttpRequest) -> HttpResponse:
     form = SearchForm()
     query = None
@@ -125,11 +235,15 @@ def post_search(request: HttpRequest) -> HttpResponse:
         form = SearchForm(request.GET)
         if form.is_valid():
             query = form.cleaned_data["query"]
-            results = (
-                Post.published.annotate(similarity=TrigramSimilarity("title", query))
-                .filter(similarity__gt=0.1)
-                .order_by("-similarity")
+            paginator = Paginator(
+                object_list=search_post_ids(query),
+                per_page=settings.BLOG_SEARCH_RESULTS_PER_PAGE,
             )
+            results = paginator.get_page(number=request.GET.get("page", default=1))
+            posts = Post.published.in_bulk(results.object_list)
+            results.object_list = [
+                posts[post_id] for post_id in results.object_list if post_id in posts
+            ]
     return render(
         request=request,
         template_name="blog/post/search.html",
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class DbPoolConfig(AppConfig):
+    name = "dbpool"
+    verbose_name = "Database connections"
+
+    def ready(self):
+        from dbpool import checks  # noqa: F401
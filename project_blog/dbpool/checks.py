@@ -0,0 +1,48 @@
+"""
+Database connection checks, run by "manage.py check --database <alias>".
+"""
+
+from django.conf import settings
+from django.core.checks import Tags, Warning, register
+from django.db import connections
+
+
+def server_saturation(connection) -> list[Warning]:
+    """
+    Warn when the server is close to refusing new connections.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT count(*), current_setting('max_connections')::int "
+            "FROM pg_stat_activity WHERE backend_type = 'client backend'"
+        )
+        used, maximum = cursor.fetchone()
+    if used >= maximum * settings.DATABASE_SATURATION_WARNING:
+        return [
+            Warning(
+                f"The server of {connection.alias!r} uses {used} of its "
+                f"{maximum} connections.",
+                hint="Use a connection pool or lower the number of workers.",
+                id="dbpool.W003",
+            )
+        ]
+    return []
+
+
+@register(Tags.database)
+def check_connections(app_configs=None, databases=None, **kwargs):
+    errors = []
+    for alias in databases or []:
+        connection = connections[alias]
+        if connection.vendor != "postgresql":
+            continue
+        if connection.pool is None and connection.settings_dict["CONN_MAX_AGE"] == 0:
+            errors.append(
+                Warning(
+                    f"{alias!r} opens a new connection for every request.",
+                    hint="Set DATABASE_CONN_MAX_AGE or enable DATABASE_POOL.",
+                    id="dbpool.W001",
+                )
+            )
+        errors += server_saturation(connection)
+    return errors
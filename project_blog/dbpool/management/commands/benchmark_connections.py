@@ -0,0 +1,105 @@
+import json
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+MODES = ("connect", "persistent", "pool")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the throughput of a connection per request, persistent "
+        "connections and a connection pool on the default database, and "
+        "print the results as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Number of simulated requests sent by every thread.",
+        )
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--query", default="SELECT 1")
+        parser.add_argument(
+            "--mode", choices=MODES, action="append", help="Defaults to all of them."
+        )
+
+    def handle(self, *args, **options):
+        results = {
+            mode: self.run(
+                mode, options["requests"], options["concurrency"], options["query"]
+            )
+            for mode in options["mode"] or MODES
+        }
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def database_settings(self, mode: str, concurrency: int) -> dict:
+        database = {
+            **connections[DEFAULT_DB_ALIAS].settings_dict,
+            "CONN_MAX_AGE": None if mode == "persistent" else 0,
+        }
+        options = {
+            key: value
+            for key, value in database.get("OPTIONS", {}).items()
+            if key != "pool"
+        }
+        if mode == "pool":
+            options["pool"] = {"min_size": concurrency, "max_size": concurrency}
+        database["OPTIONS"] = options
+        return database
+
+    def run(self, mode: str, requests: int, concurrency: int, query: str) -> dict:
+        # Pools are shared per alias, don't touch the one of "default".
+        alias = f"benchmark_{mode}"
+        # Connections of the alias are thread-local, every thread gets its own.
+        connections.settings[alias] = self.database_settings(mode, concurrency)
+        latencies = []
+        errors = []
+        lock = threading.Lock()
+
+        def worker():
+            connection = connections[alias]
+            thread_latencies = []
+            for _ in range(requests):
+                start = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute(query)
+                    cursor.fetchall()
+                # What Django does when a request finishes.
+                connection.close_if_unusable_or_obsolete()
+                thread_latencies.append((time.perf_counter() - start) * 1000)
+            connection.close()
+            with lock:
+                latencies.extend(thread_latencies)
+
+        def run_worker():
+            try:
+                worker()
+            except Exception as e:
+                with lock:
+                    errors.append(e)
+
+        threads = [threading.Thread(target=run_worker) for _ in range(concurrency)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        if mode == "pool":
+            connections[alias].close_pool()
+        del connections.settings[alias]
+        if errors:
+            raise CommandError(f"{mode}: {errors[0]}")
+
+        latencies.sort()
+        return {
+            "requests": len(latencies),
+            "requests_per_second": round(len(latencies) / elapsed, 1),
+            "p50_ms": round(latencies[len(latencies) // 2], 3),
+            "p99_ms": round(latencies[int(len(latencies) * 0.99)], 3),
+        }
@@ -0,0 +1,47 @@
+import json
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import TestCase, override_settings
+
+from dbpool.checks import check_connections
+
+
+class ConnectionChecksTests(TestCase):
+    def test_connect_per_request(self):
+        with mock.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 0}):
+            ids = [error.id for error in check_connections(databases=["default"])]
+        self.assertIn("dbpool.W001", ids)
+
+    def test_persistent_connections(self):
+        with mock.patch.dict(connection.settings_dict, {"CONN_MAX_AGE": 60}):
+            self.assertEqual(check_connections(databases=["default"]), [])
+
+    def test_only_checks_the_given_databases(self):
+        self.assertEqual(check_connections(databases=None), [])
+
+    @override_settings(DATABASE_SATURATION_WARNING=0)
+    def test_server_saturation(self):
+        ids = [error.id for error in check_connections(databases=["default"])]
+        self.assertIn("dbpool.W003", ids)
+
+
+# Test cases refuse connections to the aliases they don't declare, the
+# benchmark opens its own.
+ensure_connection = BaseDatabaseWrapper.ensure_connection
+
+
+class BenchmarkConnectionsTests(TestCase):
+    def test_benchmark(self):
+        out = StringIO()
+        with mock.patch.object(
+            BaseDatabaseWrapper, "ensure_connection", ensure_connection
+        ):
+            call_command("benchmark_connections", requests=3, concurrency=2, stdout=out)
+        results = json.loads(out.getvalue())
+        self.assertEqual(list(results), ["connect", "persistent", "pool"])
+        for result in results.values():
+            self.assertEqual(result["requests"], 6)
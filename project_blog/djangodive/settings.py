@@ -12,6 +12,8 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 
 from pathlib import Path
 
+from decouple import config
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -43,9 +45,15 @@ INSTALLED_APPS = [
     "django.contrib.postgres",
     "taggit",
     "blog.apps.BlogConfig",
+    "mailqueue.apps.MailQueueConfig",
+    "profiling.apps.ProfilingConfig",
+    "replicas.apps.ReplicasConfig",
+    "dbpool.apps.DbPoolConfig",
 ]
 
 MIDDLEWARE = [
+    "profiling.middleware.ProfilingMiddleware",
+    "replicas.middleware.ReplicaStickinessMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -78,6 +86,21 @@ WSGI_APPLICATION = "djangodive.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Connections are kept open for DATABASE_CONN_MAX_AGE seconds and checked
+# before being reused. With DATABASE_POOL, requests borrow connections from
+# a psycopg pool instead, which doesn't support persistent connections.
+# https://docs.djangoproject.com/en/5.2/ref/databases/#persistent-connections
+# https://docs.djangoproject.com/en/5.2/ref/databases/#connection-pool
+DATABASE_POOL = config("DATABASE_POOL", default=False, cast=bool)
+DATABASE_POOL_OPTIONS = {
+    "min_size": config("DATABASE_POOL_MIN_SIZE", default=2, cast=int),
+    "max_size": config("DATABASE_POOL_MAX_SIZE", default=10, cast=int),
+    # Seconds a request waits for a free connection before failing.
+    "timeout": config("DATABASE_POOL_TIMEOUT", default=10, cast=float),
+}
+# Share of the server max_connections above which "check --database" warns.
+DATABASE_SATURATION_WARNING = 0.8
+
 DATABASES = {
     # "default": {
     #     "ENGINE": "django.db.backends.sqlite3",
@@ -90,10 +113,72 @@ DATABASES = {
         "PASSWORD": "postgres",
         "HOST": "localhost",
         "PORT": "5432",
+        "CONN_MAX_AGE": 0
+        if DATABASE_POOL
+        else config("DATABASE_CONN_MAX_AGE", default=60, cast=int),
+        "CONN_HEALTH_CHECKS": config(
+            "DATABASE_CONN_HEALTH_CHECKS", default=True, cast=bool
+        ),
+        "OPTIONS": {"pool": DATABASE_POOL_OPTIONS} if DATABASE_POOL else {},
     }
 }
 
 
+# Read replica of "default", on DATABASE_REPLICA_HOST (the primary itself by
+# default). Tests read the test database of "default" through it.
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    "HOST": config("DATABASE_REPLICA_HOST", default="localhost"),
+    "PORT": config("DATABASE_REPLICA_PORT", default="5432"),
+    "TEST": {"MIRROR": "default"},
+}
+
+# Aliases of the DATABASES entries used as read replicas by
+# replicas.routers.ReplicaRouter.
+DATABASE_REPLICAS = ["replica"]
+DATABASE_ROUTERS = ["replicas.routers.ReplicaRouter"]
+# Seconds during which a client reads from the primary after a write.
+REPLICA_STICKY_SECONDS = 5
+REPLICA_STICKY_COOKIE = "use_primary"
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    }
+}
+
+BLOG_CACHE_TIMEOUT = 60 * 60
+
+# Paginate the post list with "cursor" (keyset) or "numbered" pages.
+BLOG_PAGINATION = "cursor"
+
+BLOG_SEARCH_MAX_RESULTS = 100
+BLOG_SEARCH_RESULTS_PER_PAGE = 10
+BLOG_SEARCH_CACHE_TIMEOUT = 60
+
+BLOG_FEED_ITEMS = 5
+
+BLOG_SITEMAP_LIMIT = 1000
+
+# New comments stay hidden until the moderate_comments command approves them.
+BLOG_COMMENT_MODERATION = True
+BLOG_COMMENT_CHECKS = [
+    "blog.moderation.too_many_links",
+    "blog.moderation.blocked_words",
+]
+BLOG_COMMENT_MAX_LINKS = 2
+BLOG_COMMENT_BLOCKED_WORDS = []
+# (number of comments, period in seconds) allowed per client IP and per post.
+BLOG_COMMENT_RATE_LIMITS = {
+    "ip": (5, 60),
+    "post": (30, 60),
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,4 +222,29 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 
 # SMTP
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# Emails are queued in the database and delivered by the process_mail_queue
+# command through MAIL_QUEUE_BACKEND.
+EMAIL_BACKEND = "mailqueue.backends.QueuedEmailBackend"
+MAIL_QUEUE_BACKEND = "django.core.mail.backends.console.EmailBackend"
+MAIL_QUEUE_BATCH_SIZE = 50
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+# Seconds before the first retry, doubled on every failed attempt.
+MAIL_QUEUE_RETRY_DELAY = 60
+# Seconds a worker has to send the batch it claimed before other workers
+# retry it.
+MAIL_QUEUE_LEASE = 5 * 60
+# Maximum number of emails sent per second, 0 for no limit.
+MAIL_QUEUE_RATE = 0
+
+# Request profiling, see profiling.middleware.ProfilingMiddleware.
+PROFILING_ENABLED = False
+# Share of the requests profiled, from 0 to 1.
+PROFILING_SAMPLE_RATE = 1.0
+# Only the profiled requests at least this slow (in ms) are recorded.
+PROFILING_RECORD_MS = 0
+# Number of recorded requests kept in memory by every process.
+PROFILING_BUFFER_SIZE = 200
+PROFILING_SLOWEST_QUERIES = 5
+# Queries run this many times in a request are reported as duplicates.
+PROFILING_DUPLICATE_THRESHOLD = 2
+PROFILING_SERVER_TIMING = True
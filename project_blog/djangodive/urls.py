@@ -16,23 +16,18 @@ Including another URLconf
 """
 
 from django.contrib import admin
-from django.urls import path, include
-from django.contrib.sitemaps.views import sitemap
-
-from blog.sitemaps import PostSitemap
-
-sitemaps = {
-    "posts": PostSitemap,
-}
+from django.urls import include, path
 
+from blog.sitemaps import sitemap, sitemap_index
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("blog/", include("blog.urls", namespace="blog")),
+    path("profiling/", include("profiling.urls", namespace="profiling")),
+    path("sitemap.xml", sitemap_index, name="sitemap_index"),
     path(
-        "sitemap.xml",
+        "sitemap-<section>.xml",
         sitemap,
-        {"sitemaps": {"posts": PostSitemap}},
         name="django.contrib.sitemaps.views.sitemap",
     ),
 ]
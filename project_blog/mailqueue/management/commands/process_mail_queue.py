@@ -0,0 +1,48 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from mailqueue.worker import send_batch
+
+
+class Command(BaseCommand):
+    help = "Send the queued emails which are due."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=settings.MAIL_QUEUE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=settings.MAIL_QUEUE_RATE,
+            help="Maximum number of emails sent per second, 0 for no limit.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling the queue instead of exiting once it is empty.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls of an empty queue.",
+        )
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_batch(
+                batch_size=options["batch_size"], rate=options["rate"]
+            )
+            total_sent += sent
+            total_failed += failed
+            if not sent and not failed:
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Sent {total_sent} email(s), {total_failed} failed.")
+        )
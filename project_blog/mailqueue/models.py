@@ -0,0 +1,39 @@
+from django.db import models
+from django.utils import timezone
+
+# Create your models here.
+
+
+class OutboundEmail(models.Model):
+    class Status(models.TextChoices):
+        QUEUED = "QD", "Queued"
+        SENT = "ST", "Sent"
+        FAILED = "FL", "Failed"
+
+    subject = models.TextField()
+    body = models.TextField()
+    from_email = models.CharField(max_length=254, blank=True)
+    to = models.JSONField(default=list)
+    cc = models.JSONField(default=list)
+    bcc = models.JSONField(default=list)
+    reply_to = models.JSONField(default=list)
+    headers = models.JSONField(default=dict)
+    # [content, mimetype] pairs.
+    alternatives = models.JSONField(default=list)
+    # [filename, base64 content, mimetype] triples.
+    attachments = models.JSONField(default=list)
+    status = models.CharField(max_length=2, choices=Status, default=Status.QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    sent = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ("next_attempt",)
+        indexes = [
+            models.Index(fields=["status", "next_attempt"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} to {', '.join(self.to)}"
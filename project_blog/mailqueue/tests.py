@@ -0,0 +1,96 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from mailqueue.models import OutboundEmail
+from mailqueue.worker import send_batch
+
+
+@override_settings(
+    EMAIL_BACKEND="mailqueue.backends.QueuedEmailBackend",
+    MAIL_QUEUE_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+    MAIL_QUEUE_MAX_ATTEMPTS=2,
+    MAIL_QUEUE_RATE=0,
+)
+class MailQueueTests(TestCase):
+    def send(self, count: int = 1):
+        for i in range(count):
+            message = mail.EmailMultiAlternatives(
+                subject=f"Hello {i}",
+                body="Plain body",
+                to=["to@example.com"],
+                headers={"X-Test": "yes"},
+            )
+            message.attach_alternative("<p>HTML body</p>", "text/html")
+            message.attach("note.txt", "Attached", "text/plain")
+            message.send()
+
+    def test_messages_are_queued(self):
+        self.send()
+        self.assertEqual(len(mail.outbox), 0)
+        email = OutboundEmail.objects.get()
+        self.assertEqual(email.status, OutboundEmail.Status.QUEUED)
+        self.assertEqual(email.to, ["to@example.com"])
+
+    def test_worker_sends_queued_messages(self):
+        self.send(3)
+        out = StringIO()
+        call_command("process_mail_queue", batch_size=2, stdout=out)
+        self.assertIn("Sent 3 email(s), 0 failed.", out.getvalue())
+        self.assertEqual(len(mail.outbox), 3)
+        message = mail.outbox[0]
+        self.assertEqual(message.extra_headers["X-Test"], "yes")
+        self.assertEqual(message.alternatives[0].content, "<p>HTML body</p>")
+        self.assertEqual(message.attachments[0].content, "Attached")
+        self.assertFalse(
+            OutboundEmail.objects.exclude(status=OutboundEmail.Status.SENT).exists()
+        )
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        self.send()
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=OSError("Connection refused"),
+        ):
+            self.assertEqual(send_batch(), (0, 1))
+            email = OutboundEmail.objects.get()
+            self.assertEqual(email.status, OutboundEmail.Status.QUEUED)
+            self.assertGreater(email.next_attempt, timezone.now())
+            self.assertIn("Connection refused", email.last_error)
+            # Not due yet.
+            self.assertEqual(send_batch(), (0, 0))
+
+            email.next_attempt = timezone.now() - timedelta(seconds=1)
+            email.save()
+            self.assertEqual(send_batch(), (0, 1))
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboundEmail.Status.FAILED)
+        self.assertEqual(email.attempts, 2)
+
+    def test_connection_failure_is_retried_with_backoff(self):
+        self.send(2)
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open",
+            side_effect=ConnectionRefusedError("Connection refused"),
+        ):
+            self.assertEqual(send_batch(), (0, 2))
+        for email in OutboundEmail.objects.all():
+            self.assertEqual(email.status, OutboundEmail.Status.QUEUED)
+            self.assertEqual(email.attempts, 1)
+            self.assertGreater(email.next_attempt, timezone.now())
+            self.assertIn("Connection refused", email.last_error)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_claimed_emails_are_leased(self):
+        self.send()
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.send_messages",
+            side_effect=lambda messages: self.assertEqual(send_batch(), (0, 0)),
+        ):
+            # The email is claimed by the outer batch, the inner one skips it.
+            self.assertEqual(send_batch(), (1, 0))
@@ -0,0 +1,120 @@
+"""
+Delivery of the queued emails.
+
+Batches of due emails are claimed with SELECT ... FOR UPDATE SKIP LOCKED in a
+short transaction, which leases them for MAIL_QUEUE_LEASE seconds, so several
+workers can run side by side without holding locks while they talk to the
+mail server. The batch is then sent over a single connection of the
+MAIL_QUEUE_BACKEND. Failed deliveries, including a connection which can't be
+opened, are retried with an exponential backoff until MAIL_QUEUE_MAX_ATTEMPTS
+is reached.
+"""
+
+import base64
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from mailqueue.models import OutboundEmail
+
+
+def to_message(email: OutboundEmail, connection) -> EmailMultiAlternatives:
+    message = EmailMultiAlternatives(
+        subject=email.subject,
+        body=email.body,
+        from_email=email.from_email or None,
+        to=email.to,
+        cc=email.cc,
+        bcc=email.bcc,
+        reply_to=email.reply_to,
+        headers=email.headers,
+        connection=connection,
+    )
+    for content, mimetype in email.alternatives:
+        message.attach_alternative(content, mimetype)
+    for filename, content, mimetype in email.attachments:
+        message.attach(filename, base64.b64decode(content), mimetype)
+    return message
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.MAIL_QUEUE_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def claim_batch(batch_size: int) -> list[OutboundEmail]:
+    """
+    Claim due emails. Their next attempt is pushed past the lease, so that
+    other workers skip them and they come back if this one dies.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboundEmail.objects.select_for_update(skip_locked=True)
+            .filter(status=OutboundEmail.Status.QUEUED, next_attempt__lte=now)
+            .order_by("next_attempt")[:batch_size]
+        )
+        OutboundEmail.objects.filter(id__in=[email.id for email in emails]).update(
+            attempts=F("attempts") + 1,
+            next_attempt=now + timedelta(seconds=settings.MAIL_QUEUE_LEASE),
+        )
+    for email in emails:
+        email.attempts += 1
+    return emails
+
+
+def store_failure(email: OutboundEmail, error: Exception) -> None:
+    email.last_error = repr(error)
+    if email.attempts >= settings.MAIL_QUEUE_MAX_ATTEMPTS:
+        email.status = OutboundEmail.Status.FAILED
+    else:
+        email.next_attempt = timezone.now() + retry_delay(email.attempts)
+    email.save(update_fields=["status", "next_attempt", "last_error"])
+
+
+def send_batch(
+    batch_size: int | None = None, rate: float | None = None
+) -> tuple[int, int]:
+    """
+    Send one batch of due emails, at most ``rate`` per second, and return the
+    number of emails sent and failed.
+    """
+    batch_size = batch_size or settings.MAIL_QUEUE_BATCH_SIZE
+    rate = settings.MAIL_QUEUE_RATE if rate is None else rate
+    emails = claim_batch(batch_size)
+    if not emails:
+        return 0, 0
+
+    connection = get_connection(settings.MAIL_QUEUE_BACKEND)
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            store_failure(email, error)
+        return 0, len(emails)
+
+    sent = failed = 0
+    try:
+        for email in emails:
+            started = time.monotonic()
+            try:
+                to_message(email, connection).send()
+            except Exception as error:
+                failed += 1
+                store_failure(email, error)
+            else:
+                sent += 1
+                email.status = OutboundEmail.Status.SENT
+                email.sent = timezone.now()
+                # Saved at once, so that a worker dying later in the batch
+                # doesn't send it again when the lease expires.
+                email.save(update_fields=["status", "sent"])
+            if rate:
+                time.sleep(max(0.0, 1 / rate - (time.monotonic() - started)))
+    finally:
+        connection.close()
+    return sent, failed
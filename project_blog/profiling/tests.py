@@ -0,0 +1,99 @@
+import subprocess
+import sys
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import connection
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from profiling import profiler
+from profiling.middleware import ProfilingMiddleware
+
+
+def n_plus_one_view(request):
+    groups = list(Group.objects.all())
+    for group in groups:
+        list(group.permissions.all())
+    content = Template("{% for group in groups %}{{ group.name }}{% endfor %}").render(
+        Context({"groups": groups})
+    )
+    return HttpResponse(content)
+
+
+@override_settings(
+    PROFILING_ENABLED=True,
+    PROFILING_SAMPLE_RATE=1.0,
+    PROFILING_RECORD_MS=0,
+    PROFILING_SERVER_TIMING=True,
+)
+class ProfilingMiddlewareTests(TestCase):
+    def setUp(self):
+        profiler.clear()
+        Group.objects.bulk_create([Group(name="one"), Group(name="two")])
+        self.request = RequestFactory().get("/groups/")
+
+    def test_profile_is_recorded(self):
+        response = ProfilingMiddleware(n_plus_one_view)(self.request)
+        timing = response.headers["Server-Timing"]
+        self.assertIn('desc="3 queries"', timing)
+        self.assertIn("template;dur=", timing)
+
+        [profile] = profiler.recorded()
+        self.assertEqual(profile["path"], "/groups/")
+        self.assertEqual(profile["status"], 200)
+        self.assertEqual(profile["queries"], 3)
+        [duplicate] = profile["duplicate_queries"]
+        self.assertEqual(duplicate["count"], 2)
+        self.assertIn("auth_permission", duplicate["sql"])
+        self.assertEqual(len(profile["slowest_queries"]), 2)
+
+    def test_profiler_detaches_after_the_request(self):
+        ProfilingMiddleware(n_plus_one_view)(self.request)
+        self.assertEqual(connection.execute_wrappers, [])
+        self.assertIsNone(profiler.current_profile.get())
+
+    @override_settings(PROFILING_SAMPLE_RATE=0)
+    def test_sampling(self):
+        response = ProfilingMiddleware(n_plus_one_view)(self.request)
+        self.assertNotIn("Server-Timing", response.headers)
+        self.assertEqual(profiler.recorded(), [])
+
+    @override_settings(PROFILING_RECORD_MS=60_000)
+    def test_fast_requests_are_not_recorded(self):
+        response = ProfilingMiddleware(n_plus_one_view)(self.request)
+        self.assertIn("Server-Timing", response.headers)
+        self.assertEqual(profiler.recorded(), [])
+
+    def test_report_is_staff_only(self):
+        url = reverse("profiling:report")
+        user = get_user_model().objects.create_user(username="user")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        user.is_staff = True
+        user.save()
+        ProfilingMiddleware(n_plus_one_view)(self.request)
+        report = self.client.get(url).json()
+        self.assertEqual(report["views"]["/groups/"]["requests"], 1)
+        self.assertEqual(len(report["requests"]), 1)
+
+
+class ProfilerImportTests(SimpleTestCase):
+    def test_section_doesnt_need_the_profiling_settings(self):
+        code = (
+            "from django.conf import settings\n"
+            "settings.configure()\n"
+            "from profiling.profiler import section\n"
+            "with section('markdown'):\n"
+            "    pass\n"
+        )
+        subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR,
+            check=True,
+            capture_output=True,
+        )
@@ -0,0 +1,6 @@
+from django.apps import AppConfig
+
+
+class ReplicasConfig(AppConfig):
+    name = "replicas"
+    verbose_name = "Read replicas"
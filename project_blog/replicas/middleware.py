@@ -0,0 +1,44 @@
+import time
+
+from django.conf import settings
+
+from replicas.routers import use_primary
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+
+class ReplicaStickinessMiddleware:
+    """
+    Read from the primary during unsafe requests and, for
+    REPLICA_STICKY_SECONDS after one of them, during the following requests
+    of the same client, so that it sees its writes despite the replication
+    lag. The deadline is held in a cookie.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def is_sticky(self, request) -> bool:
+        try:
+            deadline = float(request.COOKIES.get(settings.REPLICA_STICKY_COOKIE, 0))
+        except ValueError:
+            return False
+        return deadline > time.time()
+
+    def __call__(self, request):
+        writes = request.method not in SAFE_METHODS
+        if writes or self.is_sticky(request):
+            with use_primary():
+                response = self.get_response(request)
+        else:
+            response = self.get_response(request)
+
+        if writes:
+            response.set_cookie(
+                settings.REPLICA_STICKY_COOKIE,
+                str(time.time() + settings.REPLICA_STICKY_SECONDS),
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -0,0 +1,118 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+
+from replicas.middleware import ReplicaStickinessMiddleware
+from replicas.routers import ReplicaRouter, pinned_to_primary, use_primary
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        self.router = ReplicaRouter()
+        self.model = get_user_model()
+
+    def test_routing(self):
+        self.assertEqual(self.router.db_for_write(self.model), "default")
+        self.assertEqual(self.router.db_for_read(self.model), "replica")
+        with use_primary():
+            self.assertEqual(self.router.db_for_read(self.model), "default")
+        self.assertEqual(self.router.db_for_read(self.model), "replica")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        self.assertEqual(self.router.db_for_read(self.model), "default")
+
+    def test_migrations_only_run_on_the_primary(self):
+        self.assertTrue(self.router.allow_migrate("default", "auth"))
+        self.assertFalse(self.router.allow_migrate("replica", "auth"))
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaRouterTransactionTests(TestCase):
+    def test_reads_in_a_transaction_use_the_primary(self):
+        # TestCase runs every test in a transaction of the primary.
+        with transaction.atomic():
+            self.assertEqual(ReplicaRouter().db_for_read(get_user_model()), "default")
+
+
+class ReplicaIntegrationTests(TransactionTestCase):
+    """
+    Run the queries against the "replica" alias, a test mirror of "default"
+    with its own connection, outside of a transaction.
+    """
+
+    databases = {"default", "replica"}
+
+    def capture(self) -> tuple[CaptureQueriesContext, CaptureQueriesContext]:
+        return (
+            CaptureQueriesContext(connections["default"]),
+            CaptureQueriesContext(connections["replica"]),
+        )
+
+    def test_reads_go_to_the_replica(self):
+        user = get_user_model().objects.create_user(username="reader")
+        primary, replica = self.capture()
+        with primary, replica:
+            self.assertEqual(get_user_model().objects.get(username="reader"), user)
+        self.assertEqual(len(primary), 0)
+        self.assertEqual(len(replica), 1)
+
+    def test_writes_and_their_reads_go_to_the_primary(self):
+        primary, replica = self.capture()
+        with primary, replica, use_primary():
+            user = get_user_model().objects.create_user(username="writer")
+            self.assertEqual(get_user_model().objects.get(username="writer"), user)
+        self.assertEqual(len(replica), 0)
+        self.assertEqual(
+            [query["sql"].split()[0] for query in primary], ["INSERT", "SELECT"]
+        )
+
+
+@override_settings(REPLICA_STICKY_SECONDS=5, REPLICA_STICKY_COOKIE="use_primary")
+class ReplicaStickinessMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.pinned = None
+
+        def view(request):
+            self.pinned = pinned_to_primary.get()
+            return HttpResponse()
+
+        self.middleware = ReplicaStickinessMiddleware(view)
+
+    def test_writes_are_sticky(self):
+        response = self.middleware(self.factory.post("/"))
+        self.assertTrue(self.pinned)
+        cookie = response.cookies["use_primary"]
+        self.assertEqual(cookie["max-age"], 5)
+
+        request = self.factory.get("/")
+        request.COOKIES["use_primary"] = cookie.value
+        response = self.middleware(request)
+        self.assertTrue(self.pinned)
+        self.assertNotIn("use_primary", response.cookies)
+        self.assertFalse(pinned_to_primary.get())
+
+    def test_reads_use_the_replicas(self):
+        self.middleware(self.factory.get("/"))
+        self.assertFalse(self.pinned)
+
+        request = self.factory.get("/")
+        request.COOKIES["use_primary"] = str(time.time() - 1)
+        self.middleware(request)
+        self.assertFalse(self.pinned)
+
+        request.COOKIES["use_primary"] = "garbage"
+        self.middleware(request)
+        self.assertFalse(self.pinned)
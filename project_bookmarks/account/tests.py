@@ -1,3 +1,20 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+from mailqueue.models import OutboundEmail
+
+
+@override_settings(EMAIL_BACKEND="mailqueue.backends.QueuedEmailBackend")
+class PasswordResetTests(TestCase):
+    def test_password_reset_only_enqueues_the_email(self):
+        get_user_model().objects.create_user(
+            username="user", email="user@example.com", password="secret"
+        )
+        response = self.client.post(
+            reverse("password_reset"), {"email": "user@example.com"}
+        )
+        self.assertRedirects(response, reverse("password_reset_done"))
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutboundEmail.objects.get().to, ["user@example.com"])
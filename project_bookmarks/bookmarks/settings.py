@@ -48,9 +48,14 @@ INSTALLED_APPS = [
     "social_django",
     "django_extensions",
     "images.apps.ImagesConfig",
+    "mailqueue.apps.MailQueueConfig",
+    "profiling.apps.ProfilingConfig",
+    "replicas.apps.ReplicasConfig",
 ]
 
 MIDDLEWARE = [
+    "profiling.middleware.ProfilingMiddleware",
+    "replicas.middleware.ReplicaStickinessMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -91,6 +96,23 @@ DATABASES = {
 }
 
 
+# SQLite doesn't replicate, the replica is a second connection to the same
+# file, so that the routing runs in development. Tests read the test database
+# of "default" through it.
+DATABASES["replica"] = {
+    **DATABASES["default"],
+    "TEST": {"MIRROR": "default"},
+}
+
+# Aliases of the DATABASES entries used as read replicas by
+# replicas.routers.ReplicaRouter.
+DATABASE_REPLICAS = ["replica"]
+DATABASE_ROUTERS = ["replicas.routers.ReplicaRouter"]
+# Seconds during which a client reads from the primary after a write.
+REPLICA_STICKY_SECONDS = 5
+REPLICA_STICKY_COOKIE = "use_primary"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -137,12 +159,81 @@ LOGIN_REDIRECT_URL = "dashboard"
 LOGIN_URL = "login"
 LOGOUT = "logout"
 
-EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
+# Emails are queued in the database and delivered by the process_mail_queue
+# command through MAIL_QUEUE_BACKEND.
+EMAIL_BACKEND = "mailqueue.backends.QueuedEmailBackend"
+MAIL_QUEUE_BACKEND = "django.core.mail.backends.console.EmailBackend"
+MAIL_QUEUE_BATCH_SIZE = 50
+MAIL_QUEUE_MAX_ATTEMPTS = 5
+# Seconds before the first retry, doubled on every failed attempt.
+MAIL_QUEUE_RETRY_DELAY = 60
+# Seconds a worker has to send the batch it claimed before other workers
+# retry it.
+MAIL_QUEUE_LEASE = 5 * 60
+# Maximum number of emails sent per second, 0 for no limit.
+MAIL_QUEUE_RATE = 0
+
+# Request profiling, see profiling.middleware.ProfilingMiddleware.
+PROFILING_ENABLED = False
+# Share of the requests profiled, from 0 to 1.
+PROFILING_SAMPLE_RATE = 1.0
+# Only the profiled requests at least this slow (in ms) are recorded.
+PROFILING_RECORD_MS = 0
+# Number of recorded requests kept in memory by every process.
+PROFILING_BUFFER_SIZE = 200
+PROFILING_SLOWEST_QUERIES = 5
+# Queries run this many times in a request are reported as duplicates.
+PROFILING_DUPLICATE_THRESHOLD = 2
+PROFILING_SERVER_TIMING = True
 
 
 MEDIA_URL = "media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Bookmarked images are downloaded by the fetch_images worker.
+IMAGES_FETCH_BATCH_SIZE = 10
+# Seconds allowed to connect, and between two received chunks.
+IMAGES_FETCH_TIMEOUT = 10
+IMAGES_FETCH_MAX_BYTES = 10 * 1024 * 1024
+IMAGES_FETCH_MAX_ATTEMPTS = 3
+# Seconds before the first retry, doubled on every failed attempt.
+IMAGES_FETCH_RETRY_DELAY = 60
+# Seconds during which the file downloaded from a URL is reused by the new
+# bookmarks of the same URL.
+IMAGES_FETCH_REUSE_AGE = 24 * 60 * 60
+
+IMAGES_PER_PAGE = 24
+
+# Store of the image views, flushed to the database by flush_image_views: the
+# Redis server at REDIS_URL, shared by the processes. Without REDIS_URL the
+# views are kept in the memory of each process, which only suits development
+# (check warns about it when DEBUG is off).
+REDIS_URL = config("REDIS_URL", default="")
+IMAGES_VIEW_COUNTER = (
+    {
+        "BACKEND": "images.counters.RedisViewCounter",
+        "OPTIONS": {"url": REDIS_URL},
+    }
+    if REDIS_URL
+    else {"BACKEND": "images.counters.LocalViewCounter"}
+)
+IMAGES_RANKING_SIZE = 10
+
+# Thumbnails of the images, fitted in (width, height) boxes, in the format of
+# the original and in WebP.
+THUMBNAIL_SIZES = {
+    "small": (150, 150),
+    "medium": (300, 300),
+    "large": (800, 800),
+}
+THUMBNAIL_WEBP = True
+THUMBNAIL_QUALITY = 80
+# Directory of the thumbnails inside MEDIA_ROOT.
+THUMBNAIL_DIR = "thumbnails"
+# Generate the thumbnails when an image is downloaded instead of on the first
+# request.
+THUMBNAIL_ON_FETCH = True
+
 AUTHENTICATION_BACKENDS = [
     "django.contrib.auth.backends.ModelBackend",
     "account.authentication.EmailAuthBackend",
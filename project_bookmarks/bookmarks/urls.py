@@ -25,6 +25,7 @@ urlpatterns = [
     path("account/", include("account.urls")),
     path("social-auth/", include("social_django.urls", namespace="social")),
     path("images/", include("images.urls", namespace="images")),
+    path("profiling/", include("profiling.urls", namespace="profiling")),
 ]
 
 if settings.DEBUG:
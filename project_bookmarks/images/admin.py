@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from images.models import Image
+from images.models import Image, ImageBlob
 
 # Register your models here.
 
@@ -12,5 +12,13 @@ class ImageAdmin(admin.ModelAdmin):
         "slug",
         "image",
         "created",
+        "status",
     ]
-    list_filter = ["created"]
+    list_filter = ["status", "created"]
+    raw_id_fields = ["blob"]
+
+
+@admin.register(ImageBlob)
+class ImageBlobAdmin(admin.ModelAdmin):
+    list_display = ["sha256", "file", "size", "created"]
+    search_fields = ["sha256"]
@@ -0,0 +1,79 @@
+"""
+Content-addressed storage of the downloaded images.
+
+Files are identified by the SHA-256 of their content and stored once, under a
+name derived from it, however many images point to them. Images of a URL
+downloaded less than IMAGES_FETCH_REUSE_AGE seconds ago reuse its blob
+without downloading it again.
+"""
+
+import hashlib
+import os
+from datetime import timedelta
+from typing import BinaryIO
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from images.models import Image, ImageBlob
+
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_name(digest: str, extension: str) -> str:
+    return f"images/blobs/{digest[:2]}/{digest}.{extension}"
+
+
+def hash_file(file: BinaryIO) -> tuple[str, int]:
+    """
+    Return the SHA-256 digest and the size of the file.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    while chunk := file.read(CHUNK_SIZE):
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def get_or_create_blob(
+    path: str, digest: str, extension: str
+) -> tuple[ImageBlob, bool]:
+    """
+    Return the blob of the downloaded file at ``path``, storing the file if
+    its content is new, and whether it was created.
+    """
+    blob = ImageBlob.objects.filter(sha256=digest).first()
+    if blob is not None:
+        return blob, False
+    name = blob_name(digest, extension)
+    if not default_storage.exists(name):
+        with open(path, "rb") as file:
+            name = default_storage.save(name, File(file))
+    return ImageBlob.objects.get_or_create(
+        sha256=digest, defaults={"file": name, "size": os.path.getsize(path)}
+    )
+
+
+def recent_blobs(urls: set[str]) -> dict[str, ImageBlob]:
+    """
+    Return the blobs of the URLs downloaded recently, by URL.
+    """
+    if not urls:
+        return {}
+    since = timezone.now() - timedelta(seconds=settings.IMAGES_FETCH_REUSE_AGE)
+    images = (
+        Image.objects.filter(
+            url__in=urls,
+            status=Image.Status.READY,
+            fetched__gte=since,
+            blob__isnull=False,
+        )
+        .select_related("blob")
+        .order_by("fetched")
+        .only("url", "blob")
+    )
+    # The latest download of every URL wins.
+    return {image.url: image.blob for image in images}
@@ -0,0 +1,24 @@
+"""
+Checks of the image settings, run by "manage.py check".
+"""
+
+from django.conf import settings
+from django.core.checks import Warning, register
+from django.utils.module_loading import import_string
+
+from images.counters import LocalViewCounter
+
+
+@register
+def check_view_counter(app_configs=None, **kwargs):
+    backend = import_string(settings.IMAGES_VIEW_COUNTER["BACKEND"])
+    if issubclass(backend, LocalViewCounter) and not settings.DEBUG:
+        return [
+            Warning(
+                "The image views are counted in the memory of each process, "
+                "flush_image_views never sees them and they are lost on restart.",
+                hint="Set REDIS_URL.",
+                id="images.W001",
+            )
+        ]
+    return []
@@ -0,0 +1,168 @@
+"""
+Counting of the image views, off the database.
+
+Every view of an image increments its score in a sorted set, which ranks the
+most viewed images, and its pending count, which the flush_image_views
+command adds to Image.total_views in bulk. The store is pluggable with
+IMAGES_VIEW_COUNTER: RedisViewCounter keeps it in a Redis server shared by
+the processes (or any client with the redis-py interface, such as
+fakeredis). LocalViewCounter keeps it in the memory of the process, for
+development and tests only: the views are lost on restart and are never seen
+by the flush_image_views command, which runs in its own process.
+"""
+
+import heapq
+import threading
+from abc import ABC, abstractmethod
+from functools import cache
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
+from django.db.models import Case, F, PositiveIntegerField, Value, When
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from images.models import Image
+
+
+class ViewCounter(ABC):
+    """
+    The interface of the view counter backends.
+    """
+
+    @abstractmethod
+    def incr(self, image_id: int) -> int:
+        """
+        Count a view of the image and return its score.
+        """
+
+    @abstractmethod
+    def ranking(self, limit: int) -> list[tuple[int, int]]:
+        """
+        Return the ids and scores of the most viewed images.
+        """
+
+    @abstractmethod
+    def drain(self) -> dict[int, int]:
+        """
+        Return the views counted since the last drain, by image id, and
+        reset them.
+        """
+
+    @abstractmethod
+    def rebuild(self, scores: dict[int, int]) -> None:
+        """
+        Replace the scores of the ranking, e.g. with the flushed totals.
+        """
+
+
+class LocalViewCounter(ViewCounter):
+    """
+    Views kept in the memory of the process, for development and tests.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.scores: dict[int, int] = {}
+        self.pending: dict[int, int] = {}
+
+    def incr(self, image_id: int) -> int:
+        with self.lock:
+            self.pending[image_id] = self.pending.get(image_id, 0) + 1
+            score = self.scores[image_id] = self.scores.get(image_id, 0) + 1
+        return score
+
+    def ranking(self, limit: int) -> list[tuple[int, int]]:
+        with self.lock:
+            return heapq.nlargest(
+                limit, self.scores.items(), key=lambda item: (item[1], item[0])
+            )
+
+    def drain(self) -> dict[int, int]:
+        with self.lock:
+            pending, self.pending = self.pending, {}
+        return pending
+
+    def rebuild(self, scores: dict[int, int]) -> None:
+        with self.lock:
+            self.scores = dict(scores)
+
+
+class RedisViewCounter(ViewCounter):
+    def __init__(
+        self, url: str = "redis://localhost:6379/0", prefix: str = "images", client=None
+    ):
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise ImproperlyConfigured(
+                    "RedisViewCounter requires the redis package."
+                ) from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.ranking_key = f"{prefix}:views:ranking"
+        self.pending_key = f"{prefix}:views:pending"
+
+    def incr(self, image_id: int) -> int:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.zincrby(self.ranking_key, 1, image_id)
+        pipe.hincrby(self.pending_key, image_id, 1)
+        score, _ = pipe.execute()
+        return int(score)
+
+    def ranking(self, limit: int) -> list[tuple[int, int]]:
+        items = self.client.zrevrange(self.ranking_key, 0, limit - 1, withscores=True)
+        return [(int(image_id), int(score)) for image_id, score in items]
+
+    def drain(self) -> dict[int, int]:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hgetall(self.pending_key)
+        pipe.delete(self.pending_key)
+        pending, _ = pipe.execute()
+        return {int(image_id): int(count) for image_id, count in pending.items()}
+
+    def rebuild(self, scores: dict[int, int]) -> None:
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self.ranking_key)
+        if scores:
+            pipe.zadd(self.ranking_key, scores)
+        pipe.execute()
+
+
+@cache
+def get_view_counter() -> ViewCounter:
+    config = settings.IMAGES_VIEW_COUNTER
+    return import_string(config["BACKEND"])(**config.get("OPTIONS", {}))
+
+
+@receiver(setting_changed)
+def reset_view_counter(*, setting: str, **kwargs) -> None:
+    if setting == "IMAGES_VIEW_COUNTER":
+        get_view_counter.cache_clear()
+
+
+def flush_views(batch_size: int = 500) -> int:
+    """
+    Add the pending views to Image.total_views, with one UPDATE per batch of
+    images, and return the number of views flushed.
+    """
+    pending = get_view_counter().drain()
+    image_ids = sorted(pending)
+    for start in range(0, len(image_ids), batch_size):
+        batch = image_ids[start : start + batch_size]
+        views = Case(
+            *(When(id=image_id, then=Value(pending[image_id])) for image_id in batch),
+            output_field=PositiveIntegerField(),
+        )
+        Image.objects.filter(id__in=batch).update(total_views=F("total_views") + views)
+    return sum(pending.values())
+
+
+def rebuild_ranking() -> None:
+    """
+    Reset the ranking to the flushed totals, e.g. after the store was lost.
+    """
+    scores = Image.objects.filter(total_views__gt=0).values_list("id", "total_views")
+    get_view_counter().rebuild(dict(scores))
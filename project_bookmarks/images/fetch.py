@@ -0,0 +1,214 @@
+"""
+Background download of the bookmarked images.
+
+Images are saved pending by image_create. The fetch_images worker claims
+batches of due images, downloads them concurrently with a shared
+httpx.AsyncClient, streaming every response into a temporary file capped at
+IMAGES_FETCH_MAX_BYTES and hashing it, and stores the files as shared blobs.
+URLs downloaded recently, or more than once in a batch, are downloaded only
+once. Network errors and server errors are retried with an exponential
+backoff until IMAGES_FETCH_MAX_ATTEMPTS is reached, other errors fail the
+image at once. With THUMBNAIL_ON_FETCH the thumbnails of new blobs are
+generated right after the download, which also fails the files Pillow can't
+read and drops their blobs.
+"""
+
+import asyncio
+import hashlib
+import os
+from datetime import timedelta
+from tempfile import NamedTemporaryFile
+
+import httpx
+from asgiref.sync import async_to_sync, sync_to_async
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from images.blobs import get_or_create_blob, recent_blobs
+from images.models import Image, ImageBlob
+from images.thumbnails import READ_ERRORS, generate_thumbnails
+
+
+class FetchError(Exception):
+    """
+    The image can't be downloaded, retrying won't help.
+    """
+
+
+def make_client(transport: httpx.AsyncBaseTransport | None = None) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=transport,
+        timeout=httpx.Timeout(settings.IMAGES_FETCH_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=settings.IMAGES_FETCH_BATCH_SIZE,
+            max_keepalive_connections=settings.IMAGES_FETCH_BATCH_SIZE,
+        ),
+        follow_redirects=True,
+    )
+
+
+async def download(client: httpx.AsyncClient, url: str) -> tuple[str, str]:
+    """
+    Download the image into a temporary file and return its path and the
+    SHA-256 digest of its content.
+    """
+    max_bytes = settings.IMAGES_FETCH_MAX_BYTES
+    async with client.stream("GET", url) as response:
+        if response.is_client_error:
+            raise FetchError(f"The server answered {response.status_code}.")
+        response.raise_for_status()
+        if not response.headers.get("content-type", "").startswith("image/"):
+            raise FetchError("The URL doesn't point to an image.")
+        if int(response.headers.get("content-length", 0)) > max_bytes:
+            raise FetchError(f"The image is larger than {max_bytes} bytes.")
+
+        digest = hashlib.sha256()
+        with NamedTemporaryFile(delete=False) as file:
+            try:
+                size = 0
+                async for chunk in response.aiter_bytes():
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise FetchError(f"The image is larger than {max_bytes} bytes.")
+                    digest.update(chunk)
+                    file.write(chunk)
+            except BaseException:
+                file.close()
+                os.unlink(file.name)
+                raise
+    return file.name, digest.hexdigest()
+
+
+def claim_batch(batch_size: int) -> list[Image]:
+    """
+    Claim due pending images. Their next fetch is pushed past the download
+    timeout, so that other workers skip them and they come back if this one
+    dies.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        images = list(
+            Image.objects.select_for_update(skip_locked=True)
+            .filter(status=Image.Status.PENDING, next_fetch__lte=now)
+            .order_by("next_fetch")
+            .only("id", "title", "url", "fetch_attempts")[:batch_size]
+        )
+        Image.objects.filter(id__in=[image.id for image in images]).update(
+            fetch_attempts=F("fetch_attempts") + 1,
+            next_fetch=now + timedelta(seconds=settings.IMAGES_FETCH_TIMEOUT * 10),
+        )
+    for image in images:
+        image.fetch_attempts += 1
+    return images
+
+
+def retry_delay(attempts: int) -> timedelta:
+    return timedelta(seconds=settings.IMAGES_FETCH_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def store_result(
+    image: Image, result: tuple[str, str] | ImageBlob | BaseException
+) -> bool:
+    """
+    Store the downloaded file (its path and digest), the blob of a recent
+    download of the same URL or the error of an image and return whether it
+    is ready.
+    """
+    if isinstance(result, tuple):
+        path, digest = result
+        extension = image.url.rsplit(".", 1)[1].lower()
+        try:
+            blob, created = get_or_create_blob(path, digest, extension)
+        finally:
+            os.unlink(path)
+        if created and settings.THUMBNAIL_ON_FETCH:
+            image.image = blob.file.name
+            try:
+                generate_thumbnails(image)
+            except READ_ERRORS:
+                # Otherwise a retry would reuse the blob and skip this check.
+                blob.file.delete(save=False)
+                blob.delete()
+                return store_result(image, FetchError("Not an image."))
+        result = blob
+
+    if isinstance(result, ImageBlob):
+        image.blob = result
+        image.image = result.file.name
+        image.status = Image.Status.READY
+        image.fetch_error = ""
+        image.fetched = timezone.now()
+        image.save(update_fields=["blob", "image", "status", "fetch_error", "fetched"])
+        return True
+
+    image.fetch_error = str(result) or repr(result)
+    if (
+        isinstance(result, FetchError)
+        or image.fetch_attempts >= settings.IMAGES_FETCH_MAX_ATTEMPTS
+    ):
+        image.status = Image.Status.FAILED
+    else:
+        image.next_fetch = timezone.now() + retry_delay(image.fetch_attempts)
+    image.save(update_fields=["status", "next_fetch", "fetch_error"])
+    return False
+
+
+async def fetch_batch(client: httpx.AsyncClient, batch_size: int) -> tuple[int, int]:
+    """
+    Download one batch of due images and return the number of images which
+    became ready and the number of failed attempts.
+    """
+    images = await sync_to_async(claim_batch)(batch_size)
+    results = await sync_to_async(recent_blobs)({image.url for image in images})
+    urls = list({image.url for image in images if image.url not in results})
+    downloads = await asyncio.gather(
+        *(download(client, url) for url in urls), return_exceptions=True
+    )
+    results.update(zip(urls, downloads))
+    ready = 0
+    for image in images:
+        result = results[image.url]
+        stored = await sync_to_async(store_result)(image, result)
+        if isinstance(result, tuple):
+            # The temporary file is gone, the next images of the URL share
+            # the outcome of this one.
+            results[image.url] = image.blob if stored else FetchError(image.fetch_error)
+        ready += stored
+    return ready, len(images) - ready
+
+
+async def _fetch_images(
+    batch_size: int,
+    loop: bool,
+    interval: float,
+    transport: httpx.AsyncBaseTransport | None,
+) -> tuple[int, int]:
+    total_ready = total_failed = 0
+    async with make_client(transport) as client:
+        while True:
+            ready, failed = await fetch_batch(client, batch_size)
+            total_ready += ready
+            total_failed += failed
+            if not ready and not failed:
+                if not loop:
+                    break
+                await asyncio.sleep(interval)
+    return total_ready, total_failed
+
+
+def fetch_images(
+    batch_size: int | None = None,
+    loop: bool = False,
+    interval: float = 5,
+    transport: httpx.AsyncBaseTransport | None = None,
+) -> tuple[int, int]:
+    """
+    Download the due images until none is left, or forever with ``loop``,
+    and return the number of images which became ready and the number of
+    failed attempts.
+    """
+    return async_to_sync(_fetch_images)(
+        batch_size or settings.IMAGES_FETCH_BATCH_SIZE, loop, interval, transport
+    )
@@ -1,7 +1,4 @@
-import httpx
 from django import forms
-from django.core.files.base import ContentFile
-from django.utils.text import slugify
 
 from images.models import Image
 
@@ -23,15 +20,3 @@ class ImageCreateForm(forms.ModelForm):
                 "The given URL does not match valid image extensions."
             )
         return url
-
-    def save(self, force_insert=False, force_update=False, commit=True):
-        image = super().save(commit=False)
-        image_url = self.cleaned_data["url"]
-        name = slugify(image.title)
-        extension = image_url.rsplit(".", 1)[1].lower()
-        image_name = f"{name}.{extension}"
-        response = httpx.get(image_url)
-        image.image.save(image_name, ContentFile(response.content), save=False)
-        if commit:
-            image.save()
-        return image
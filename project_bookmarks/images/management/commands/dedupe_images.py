@@ -0,0 +1,59 @@
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from images.blobs import hash_file
+from images.models import Image, ImageBlob
+from images.thumbnails import delete_thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Hash the downloaded images stored before deduplication, point the "
+        "identical ones to a shared blob and delete their duplicate files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        images = (
+            Image.objects.filter(status=Image.Status.READY, blob__isnull=True)
+            .exclude(image="")
+            .only("id", "image")
+            .order_by("id")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        hashed = deduplicated = freed = 0
+        for image in images:
+            try:
+                with image.image.open("rb") as file:
+                    digest, size = hash_file(file)
+            except FileNotFoundError:
+                self.stderr.write(f"Image {image.id}: {image.image.name} is missing.")
+                continue
+            hashed += 1
+
+            # The first file of a content becomes its blob, in place.
+            blob, created = ImageBlob.objects.get_or_create(
+                sha256=digest, defaults={"file": image.image.name, "size": size}
+            )
+            duplicate = image.image.name
+            if not created and duplicate != blob.file.name:
+                delete_thumbnails(image)
+                image.image = blob.file.name
+            image.blob = blob
+            image.save(update_fields=["blob", "image"])
+
+            if (
+                duplicate != blob.file.name
+                and not Image.objects.filter(image=duplicate).exists()
+            ):
+                default_storage.delete(duplicate)
+                deduplicated += 1
+                freed += size
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Hashed {hashed} image(s), deleted {deduplicated} duplicate "
+                f"file(s) ({freed} bytes)."
+            )
+        )
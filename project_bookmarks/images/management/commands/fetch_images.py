@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from images.fetch import fetch_images
+
+
+class Command(BaseCommand):
+    help = "Download the bookmarked images which are pending."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=settings.IMAGES_FETCH_BATCH_SIZE,
+            help="Number of images downloaded concurrently.",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep polling for pending images instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait between polls when no image is pending.",
+        )
+
+    def handle(self, *args, **options):
+        ready, failed = fetch_images(
+            batch_size=options["batch_size"],
+            loop=options["loop"],
+            interval=options["interval"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(f"Fetched {ready} image(s), {failed} failed attempt(s).")
+        )
@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from images.counters import (
+    LocalViewCounter,
+    flush_views,
+    get_view_counter,
+    rebuild_ranking,
+)
+
+
+class Command(BaseCommand):
+    help = "Add the views counted by the view counter to the images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Reset the ranking to the flushed totals afterwards.",
+        )
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Keep flushing the views instead of exiting.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60,
+            help="Seconds to wait between two flushes when looping.",
+        )
+
+    def handle(self, *args, **options):
+        if isinstance(get_view_counter(), LocalViewCounter):
+            self.stderr.write(
+                "LocalViewCounter only holds the views of this process, set "
+                "REDIS_URL to flush the views counted by the web server."
+            )
+        total = 0
+        while True:
+            total += flush_views(batch_size=options["batch_size"])
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
+        if options["rebuild"]:
+            rebuild_ranking()
+        self.stdout.write(self.style.SUCCESS(f"Flushed {total} view(s)."))
@@ -0,0 +1,41 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from images.models import Image
+from images.thumbnails import READ_ERRORS, delete_thumbnails, generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = "Generate the missing thumbnails of the downloaded images, or delete them."
+
+    def add_arguments(self, parser):
+        parser.add_argument("action", choices=["warm", "purge"])
+        parser.add_argument(
+            "--size",
+            action="append",
+            choices=list(settings.THUMBNAIL_SIZES),
+            help="Size to generate, defaults to all of them.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        images = (
+            Image.objects.filter(status=Image.Status.READY)
+            .only("id", "image")
+            .iterator(chunk_size=options["chunk_size"])
+        )
+        count = 0
+        if options["action"] == "purge":
+            if options["size"]:
+                raise CommandError("--size only applies to warm.")
+            for image in images:
+                count += delete_thumbnails(image)
+            self.stdout.write(self.style.SUCCESS(f"Deleted {count} thumbnail(s)."))
+            return
+
+        for image in images:
+            try:
+                count += generate_thumbnails(image, sizes=options["size"])
+            except READ_ERRORS as e:
+                self.stderr.write(f"Image {image.id}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Generated {count} thumbnail(s)."))
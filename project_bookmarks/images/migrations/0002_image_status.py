@@ -0,0 +1,58 @@
+# Generated by Django 6.0 on 2026-10-18 16:12
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("images", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="image",
+            name="fetch_attempts",
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="image",
+            name="fetch_error",
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name="image",
+            name="next_fetch",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        # The images bookmarked so far were downloaded by the form.
+        migrations.AddField(
+            model_name="image",
+            name="status",
+            field=models.CharField(
+                choices=[("PD", "Pending"), ("RD", "Ready"), ("FL", "Failed")],
+                default="RD",
+                max_length=2,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="image",
+            name="status",
+            field=models.CharField(
+                choices=[("PD", "Pending"), ("RD", "Ready"), ("FL", "Failed")],
+                default="PD",
+                max_length=2,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="image",
+            name="image",
+            field=models.ImageField(blank=True, upload_to="images/%Y/%m/%d/"),
+        ),
+        migrations.AddIndex(
+            model_name="image",
+            index=models.Index(
+                fields=["status", "next_fetch"], name="images_imag_status_9f2bd3_idx"
+            ),
+        ),
+    ]
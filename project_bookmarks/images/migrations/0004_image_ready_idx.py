@@ -0,0 +1,20 @@
+# Generated by Django 6.0 on 2026-10-18 16:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("images", "0003_image_blob"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="image",
+            index=models.Index(
+                condition=models.Q(("status", "RD")),
+                fields=["-created", "-id"],
+                name="images_image_ready_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0 on 2026-10-18 16:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("images", "0004_image_ready_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="image",
+            name="total_views",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
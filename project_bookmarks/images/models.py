@@ -2,12 +2,34 @@ from django.conf import settings
 from django.db import models
 from django.db.models.fields import CharField
 from django.forms.fields import CharField
+from django.urls import reverse
+from django.utils import timezone
 from django.utils.text import slugify
 
 # Create your models here.
 
 
+class ImageBlob(models.Model):
+    """
+    A downloaded file, stored once and shared by every image with the same
+    content.
+    """
+
+    sha256 = models.CharField(max_length=64, unique=True)
+    file = models.ImageField(upload_to="images/blobs/")
+    size = models.PositiveIntegerField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.sha256
+
+
 class Image(models.Model):
+    class Status(models.TextChoices):
+        PENDING = "PD", "Pending"
+        READY = "RD", "Ready"
+        FAILED = "FL", "Failed"
+
     user = models.ForeignKey(
         to=settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
@@ -16,7 +38,7 @@ class Image(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, blank=True)
     url = models.URLField(max_length=2000)
-    image = models.ImageField(upload_to="images/%Y/%m/%d/")
+    image = models.ImageField(upload_to="images/%Y/%m/%d/", blank=True)
     description = models.TextField(blank=True)
     created = models.DateField(auto_now_add=True)
     users_like = models.ManyToManyField(
@@ -24,14 +46,43 @@ class Image(models.Model):
         related_name="images_liked",
         blank=True,
     )
+    # Downloaded from the url by the fetch_images worker.
+    status = models.CharField(max_length=2, choices=Status, default=Status.PENDING)
+    fetch_attempts = models.PositiveSmallIntegerField(default=0)
+    next_fetch = models.DateTimeField(default=timezone.now)
+    fetch_error = models.TextField(blank=True)
+    # The image field points to the file of the blob.
+    blob = models.ForeignKey(
+        to=ImageBlob,
+        on_delete=models.PROTECT,
+        related_name="images",
+        null=True,
+        blank=True,
+    )
+    fetched = models.DateTimeField(null=True, blank=True)
+    # Flushed from the view counter by the flush_image_views command.
+    total_views = models.PositiveIntegerField(default=0)
 
     class Meta:
-        indexes = [models.Index(fields=["-created"])]
+        indexes = [
+            models.Index(fields=["-created"]),
+            models.Index(fields=["status", "next_fetch"]),
+            models.Index(fields=["url", "-fetched"]),
+            # The image list, paginated by keyset.
+            models.Index(
+                fields=["-created", "-id"],
+                condition=models.Q(status="RD"),
+                name="images_image_ready_idx",
+            ),
+        ]
         ordering = ["-created"]
 
     def __str__(self) -> CharField:
         return self.title
 
+    def get_absolute_url(self) -> str:
+        return reverse("images:detail", args=[self.id, self.slug])
+
     def save(self, *args, **kwargs) -> None:
         if not self.slug:
             self.slug = slugify(self.title)
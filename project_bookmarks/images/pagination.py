@@ -0,0 +1,49 @@
+"""
+Keyset (cursor) pagination for the image list.
+
+Pages are sliced with a WHERE clause on the ``(created, id)`` of the last
+image of the previous page instead of an OFFSET, so that scrolling deep into
+the list costs as much as the first page and no COUNT(*) is needed.
+"""
+
+import base64
+import binascii
+import json
+from datetime import date
+
+from django.db.models import Q, QuerySet
+
+
+def encode_cursor(created: date, pk: int) -> str:
+    data = json.dumps([created.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, int] | None:
+    try:
+        data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created, pk = json.loads(data)
+        return date.fromisoformat(created), int(pk)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+def get_page(
+    queryset: QuerySet, cursor: str | None, per_page: int
+) -> tuple[list, str | None]:
+    """
+    Return the images following the cursor, ordered by ``-created, -id``,
+    and the cursor of the next page, if any. Missing or invalid cursors
+    return the first page.
+    """
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        created, pk = position
+        queryset = queryset.filter(created__lte=created).filter(
+            Q(created__lt=created) | Q(created=created, id__lt=pk)
+        )
+    rows = list(queryset.order_by("-created", "-id")[: per_page + 1])
+    if len(rows) <= per_page:
+        return rows, None
+    last = rows[per_page - 1]
+    return rows[:per_page], encode_cursor(last.created, last.pk)
@@ -0,0 +1,35 @@
+// Infinite scroll: the "More images" link is replaced with the next page of
+// images when it comes into view. Without JavaScript the link still works.
+const imageList = document.getElementById('image-list');
+
+const observer = new IntersectionObserver(entries => {
+    entries.forEach(entry => {
+        if (!entry.isIntersecting) {
+            return;
+        }
+        const more = entry.target;
+        observer.unobserve(more);
+        fetch(more.dataset.fragment, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+            .then(response => {
+                if (!response.ok) {
+                    throw new Error(response.statusText);
+                }
+                return response.text();
+            })
+            .then(html => {
+                more.insertAdjacentHTML('afterend', html);
+                more.remove();
+                observeMore();
+            })
+            .catch(() => observer.observe(more));
+    });
+});
+
+function observeMore() {
+    const more = imageList.querySelector('a.more');
+    if (more) {
+        observer.observe(more);
+    }
+}
+
+observeMore();
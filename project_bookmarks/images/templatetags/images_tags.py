@@ -0,0 +1,15 @@
+from django import template
+
+from images.models import Image
+from images.thumbnails import get_thumbnail_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(image: Image, size: str, format: str | None = None) -> str:
+    """
+    Return the URL of a thumbnail of the image, in the format of the
+    original unless ``format`` (e.g. "webp") is given.
+    """
+    return get_thumbnail_url(image, size, format)
@@ -1,3 +1,531 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import BytesIO, StringIO
+from tempfile import TemporaryDirectory
+from unittest import skipUnless
+
+import httpx
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image as PILImage
+
+from images.checks import check_view_counter
+from images.counters import (
+    LocalViewCounter,
+    RedisViewCounter,
+    ViewCounter,
+    get_view_counter,
+)
+from images.fetch import fetch_images
+from images.models import Image, ImageBlob
+from images.thumbnails import thumbnail_name
+
+try:
+    import fakeredis
+except ImportError:
+    fakeredis = None
 
 # Create your tests here.
+
+
+def make_png(width: int = 400, height: int = 200) -> bytes:
+    output = BytesIO()
+    PILImage.new("RGBA", (width, height), (255, 0, 0, 128)).save(output, "png")
+    return output.getvalue()
+
+
+PNG = make_png()
+
+
+class ImageTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
+            username="user", password="secret"
+        )
+
+    def setUp(self):
+        media_root = TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root.name))
+        # A fresh local view counter for every test.
+        get_view_counter.cache_clear()
+        self.addCleanup(get_view_counter.cache_clear)
+
+    def create_image(self, url: str = "https://example.com/cat.png", **kwargs) -> Image:
+        return Image.objects.create(user=self.user, title="A cat", url=url, **kwargs)
+
+
+class ImageCreateTests(ImageTestCase):
+    def test_bookmarking_doesnt_download(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("images:create"),
+            {"title": "A cat", "url": "https://example.com/cat.png"},
+        )
+        image = Image.objects.get()
+        self.assertRedirects(response, image.get_absolute_url())
+        self.assertEqual(image.status, Image.Status.PENDING)
+        self.assertFalse(image.image)
+        self.assertContains(
+            self.client.get(image.get_absolute_url()), "is being downloaded"
+        )
+
+
+@override_settings(IMAGES_PER_PAGE=2)
+class ImageListTests(ImageTestCase):
+    @classmethod
+    def setUpTestData(cls):
+        super().setUpTestData()
+        cls.fan = get_user_model().objects.create_user(username="fan", first_name="Fan")
+        today = timezone.localdate()
+        # Two images per day, to paginate over equal dates.
+        cls.images = []
+        for i in range(5):
+            image = Image.objects.create(
+                user=cls.user,
+                title=f"Cat {i}",
+                url=f"https://example.com/cat-{i}.png",
+                status=Image.Status.READY,
+            )
+            Image.objects.filter(id=image.id).update(
+                created=today - timedelta(days=i // 2)
+            )
+            image.users_like.add(cls.fan)
+            cls.images.append(image)
+        Image.objects.create(
+            user=cls.user, title="Pending", url="https://example.com/pending.png"
+        )
+
+    def test_keyset_pagination(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("images:list"))
+        pages = [[image.id for image in response.context["images"]]]
+        cursor = response.context["next_cursor"]
+        self.assertContains(response, "1 like")
+        self.assertContains(response, reverse("images:list_fragment"))
+        while cursor:
+            with self.assertNumQueries(2):
+                response = self.client.get(
+                    reverse("images:list_fragment"), {"cursor": cursor}
+                )
+            self.assertTemplateNotUsed(response, "base.html")
+            pages.append([image.id for image in response.context["images"]])
+            cursor = response.context["next_cursor"]
+
+        by_recency = sorted(
+            Image.objects.filter(status=Image.Status.READY),
+            key=lambda image: (image.created, image.id),
+            reverse=True,
+        )
+        self.assertEqual(
+            pages,
+            [
+                [image.id for image in by_recency[:2]],
+                [image.id for image in by_recency[2:4]],
+                [by_recency[4].id],
+            ],
+        )
+        self.assertNotContains(response, "More images")
+
+    def test_invalid_cursor_returns_first_page(self):
+        first = self.client.get(reverse("images:list")).context["images"]
+        response = self.client.get(reverse("images:list"), {"cursor": "garbage"})
+        self.assertEqual(list(response.context["images"]), list(first))
+
+    def test_detail(self):
+        image = self.images[0]
+        image.image.save("cat.png", ContentFile(PNG))
+        with self.assertNumQueries(2):
+            response = self.client.get(image.get_absolute_url())
+        self.assertContains(response, "1 like")
+        self.assertContains(response, "<p>Fan</p>", html=True)
+        self.assertContains(response, "Bookmarked by user")
+
+
+@override_settings(
+    IMAGES_FETCH_MAX_BYTES=1024,
+    IMAGES_FETCH_MAX_ATTEMPTS=2,
+    IMAGES_FETCH_RETRY_DELAY=60,
+)
+class FetchImagesTests(ImageTestCase):
+    def fetch(self, handler) -> tuple[int, int]:
+        return fetch_images(transport=httpx.MockTransport(handler))
+
+    def image_response(self, request):
+        return httpx.Response(200, headers={"Content-Type": "image/png"}, content=PNG)
+
+    def test_images_are_downloaded(self):
+        images = [
+            self.create_image(url=f"https://example.com/cat-{i}.png") for i in range(3)
+        ]
+        self.assertEqual(self.fetch(self.image_response), (3, 0))
+        for image in images:
+            image.refresh_from_db()
+            self.assertEqual(image.status, Image.Status.READY)
+            self.assertEqual(image.fetch_attempts, 1)
+            with image.image.open() as file:
+                self.assertEqual(file.read(), PNG)
+        self.assertContains(
+            self.client.get(images[0].get_absolute_url()), images[0].image.url
+        )
+        self.assertEqual(self.fetch(self.image_response), (0, 0))
+
+    def test_images_too_large(self):
+        declared = self.create_image(url="https://example.com/declared.png")
+        streamed = self.create_image(url="https://example.com/streamed.png")
+
+        def handler(request):
+            if request.url.path == "/declared.png":
+                return httpx.Response(
+                    200,
+                    headers={"Content-Type": "image/png", "Content-Length": "2048"},
+                    content=b"\x00" * 2048,
+                )
+            # Streamed without a length.
+            return httpx.Response(
+                200,
+                headers={"Content-Type": "image/png"},
+                stream=httpx.ByteStream(b"\x00" * 2048),
+            )
+
+        self.assertEqual(self.fetch(handler), (0, 2))
+        for image in (declared, streamed):
+            image.refresh_from_db()
+            self.assertEqual(image.status, Image.Status.FAILED)
+            self.assertIn("larger than 1024 bytes", image.fetch_error)
+            self.assertFalse(image.image)
+
+    def test_client_errors_fail_at_once(self):
+        missing = self.create_image(url="https://example.com/missing.png")
+        page = self.create_image(url="https://example.com/page.png")
+
+        def handler(request):
+            if request.url.path == "/missing.png":
+                return httpx.Response(404)
+            return httpx.Response(200, headers={"Content-Type": "text/html"})
+
+        self.assertEqual(self.fetch(handler), (0, 2))
+        missing.refresh_from_db()
+        self.assertEqual(missing.status, Image.Status.FAILED)
+        self.assertEqual(missing.fetch_error, "The server answered 404.")
+        page.refresh_from_db()
+        self.assertEqual(page.status, Image.Status.FAILED)
+
+    def test_transient_errors_are_retried(self):
+        image = self.create_image()
+
+        def handler(request):
+            raise httpx.ConnectTimeout("timed out", request=request)
+
+        self.assertEqual(self.fetch(handler), (0, 1))
+        image.refresh_from_db()
+        self.assertEqual(image.status, Image.Status.PENDING)
+        self.assertGreater(image.next_fetch, timezone.now() + timedelta(seconds=50))
+
+        Image.objects.update(next_fetch=timezone.now())
+        self.assertEqual(self.fetch(lambda request: httpx.Response(503)), (0, 1))
+        image.refresh_from_db()
+        self.assertEqual(image.status, Image.Status.FAILED)
+        self.assertEqual(image.fetch_attempts, 2)
+
+    def test_invalid_images_fail(self):
+        image = self.create_image()
+
+        def handler(request):
+            return httpx.Response(
+                200, headers={"Content-Type": "image/png"}, content=b"\x00" * 64
+            )
+
+        self.assertEqual(self.fetch(handler), (0, 1))
+        image.refresh_from_db()
+        self.assertEqual(image.status, Image.Status.FAILED)
+        self.assertEqual(image.fetch_error, "Not an image.")
+        self.assertFalse(image.image)
+        self.assertFalse(ImageBlob.objects.exists())
+
+    def test_truncated_images_fail(self):
+        image = self.create_image()
+        other = self.create_image(url="https://example.com/other.png")
+
+        def handler(request):
+            content = PNG[: len(PNG) // 2] if request.url == image.url else PNG
+            return httpx.Response(
+                200, headers={"Content-Type": "image/png"}, content=content
+            )
+
+        self.assertEqual(self.fetch(handler), (1, 1))
+        image.refresh_from_db()
+        self.assertEqual(image.status, Image.Status.FAILED)
+        self.assertFalse(image.image)
+        other.refresh_from_db()
+        self.assertEqual(other.status, Image.Status.READY)
+        self.assertEqual(list(ImageBlob.objects.all()), [other.blob])
+
+    def test_command(self):
+        out = StringIO()
+        call_command("fetch_images", stdout=out)
+        self.assertIn("Fetched 0 image(s), 0 failed attempt(s).", out.getvalue())
+
+
+@override_settings(
+    THUMBNAIL_SIZES={"small": (100, 100), "large": (800, 800)},
+    THUMBNAIL_WEBP=True,
+)
+class ThumbnailTests(ImageTestCase):
+    def create_ready_image(self) -> Image:
+        image = self.create_image(status=Image.Status.READY)
+        image.image.save("cat.png", ContentFile(PNG))
+        return image
+
+    def thumbnails(self, image: Image) -> dict[tuple[str, str], str]:
+        return {
+            (size, format): thumbnail_name(image, size, format)
+            for size in ("small", "large")
+            for format in ("png", "webp")
+        }
+
+    def test_thumbnails_are_generated_on_fetch(self):
+        image = self.create_image()
+        fetch_images(
+            transport=httpx.MockTransport(
+                lambda request: httpx.Response(
+                    200, headers={"Content-Type": "image/png"}, content=PNG
+                )
+            )
+        )
+        image.refresh_from_db()
+        for (size, format), name in self.thumbnails(image).items():
+            with default_storage.open(name) as file, PILImage.open(file) as thumbnail:
+                self.assertEqual(thumbnail.format, format.upper())
+                # Fitted in the box, keeping the aspect ratio and never
+                # enlarging the original.
+                expected = (100, 50) if size == "small" else (400, 200)
+                self.assertEqual(thumbnail.size, expected)
+
+    def test_names_are_deterministic(self):
+        image = self.create_ready_image()
+        names = self.thumbnails(image)
+        self.assertEqual(len(set(names.values())), 4)
+        self.assertEqual(names, self.thumbnails(Image.objects.get(id=image.id)))
+        with override_settings(THUMBNAIL_QUALITY=50):
+            self.assertNotEqual(
+                thumbnail_name(image, "small", "webp"), names["small", "webp"]
+            )
+
+    def test_template_tag_generates_lazily(self):
+        image = self.create_ready_image()
+        name = thumbnail_name(image, "small", "webp")
+        self.assertFalse(default_storage.exists(name))
+        template = Template(
+            '{% load images_tags %}{% thumbnail image "small" "webp" %}'
+        )
+        self.assertEqual(
+            template.render(Context({"image": image})), default_storage.url(name)
+        )
+        self.assertTrue(default_storage.exists(name))
+        self.assertFalse(default_storage.exists(thumbnail_name(image, "small")))
+
+        pending = self.create_image()
+        self.assertEqual(template.render(Context({"image": pending})), "")
+
+        broken = self.create_image(status=Image.Status.READY)
+        broken.image.save("broken.png", ContentFile(PNG[: len(PNG) // 2]))
+        self.assertEqual(template.render(Context({"image": broken})), broken.image.url)
+
+    def test_command(self):
+        image = self.create_ready_image()
+        out = StringIO()
+        call_command("thumbnails", "warm", "--size", "small", stdout=out)
+        self.assertIn("Generated 2 thumbnail(s).", out.getvalue())
+        names = self.thumbnails(image)
+        self.assertTrue(default_storage.exists(names["small", "webp"]))
+        self.assertFalse(default_storage.exists(names["large", "webp"]))
+
+        out = StringIO()
+        call_command("thumbnails", "warm", stdout=out)
+        self.assertIn("Generated 2 thumbnail(s).", out.getvalue())
+
+        out = StringIO()
+        call_command("thumbnails", "purge", stdout=out)
+        self.assertIn("Deleted 4 thumbnail(s).", out.getvalue())
+        self.assertFalse(any(map(default_storage.exists, names.values())))
+
+
+@override_settings(IMAGES_FETCH_REUSE_AGE=3600)
+class DeduplicationTests(ImageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.requests = []
+
+    def fetch(self, content: bytes = PNG) -> tuple[int, int]:
+        def handler(request):
+            self.requests.append(str(request.url))
+            return httpx.Response(
+                200, headers={"Content-Type": "image/png"}, content=content
+            )
+
+        return fetch_images(transport=httpx.MockTransport(handler))
+
+    def test_identical_content_is_stored_once(self):
+        first = self.create_image(url="https://example.com/cat.png")
+        second = self.create_image(url="https://mirror.example.com/cat.png")
+        self.assertEqual(self.fetch(), (2, 0))
+        blob = ImageBlob.objects.get()
+        self.assertEqual(blob.size, len(PNG))
+        for image in (first, second):
+            image.refresh_from_db()
+            self.assertEqual(image.blob, blob)
+            self.assertEqual(image.image.name, blob.file.name)
+        self.assertEqual(len(self.requests), 2)
+
+        self.assertEqual(self.fetch(make_png(10, 10)), (0, 0))
+        self.create_image(url="https://example.com/other.png")
+        self.assertEqual(self.fetch(make_png(10, 10)), (1, 0))
+        self.assertEqual(ImageBlob.objects.count(), 2)
+
+    def test_recent_urls_are_not_downloaded_again(self):
+        images = [self.create_image() for _ in range(3)]
+        self.assertEqual(self.fetch(), (3, 0))
+        self.assertEqual(self.requests, ["https://example.com/cat.png"])
+
+        images.append(self.create_image())
+        self.assertEqual(self.fetch(), (1, 0))
+        self.assertEqual(len(self.requests), 1)
+        for image in images:
+            image.refresh_from_db()
+            self.assertEqual(image.status, Image.Status.READY)
+        self.assertEqual(len({image.blob_id for image in images}), 1)
+
+        Image.objects.update(fetched=timezone.now() - timedelta(hours=2))
+        self.create_image()
+        self.assertEqual(self.fetch(), (1, 0))
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(ImageBlob.objects.count(), 1)
+
+    def test_command(self):
+        images = []
+        for i, content in enumerate([PNG, PNG, make_png(10, 10)]):
+            image = self.create_image(status=Image.Status.READY)
+            image.image.save(f"cat-{i}.png", ContentFile(content))
+            images.append(image)
+        duplicate = images[1].image.name
+
+        out = StringIO()
+        call_command("dedupe_images", stdout=out)
+        self.assertIn(
+            f"Hashed 3 image(s), deleted 1 duplicate file(s) ({len(PNG)} bytes).",
+            out.getvalue(),
+        )
+        for image in images:
+            image.refresh_from_db()
+        self.assertEqual(images[0].blob, images[1].blob)
+        self.assertEqual(images[1].image.name, images[0].image.name)
+        self.assertNotEqual(images[2].blob, images[0].blob)
+        self.assertFalse(default_storage.exists(duplicate))
+        self.assertTrue(default_storage.exists(images[0].image.name))
+
+        out = StringIO()
+        call_command("dedupe_images", stdout=out)
+        self.assertIn("Hashed 0 image(s)", out.getvalue())
+
+
+class ViewCounterContract:
+    def make_counter(self) -> ViewCounter:
+        raise NotImplementedError
+
+    def test_counter(self):
+        counter = self.make_counter()
+        for image_id in [1, 2, 2, 3, 3, 3]:
+            counter.incr(image_id)
+        self.assertEqual(counter.incr(1), 2)
+        self.assertEqual(counter.ranking(2), [(3, 3), (2, 2)])
+        self.assertEqual(counter.drain(), {1: 2, 2: 2, 3: 3})
+        self.assertEqual(counter.drain(), {})
+        # Draining keeps the ranking.
+        self.assertEqual(counter.ranking(1), [(3, 3)])
+
+        counter.rebuild({1: 10, 2: 5})
+        self.assertEqual(counter.ranking(10), [(1, 10), (2, 5)])
+        self.assertEqual(counter.incr(2), 6)
+
+
+class LocalViewCounterTests(ViewCounterContract, SimpleTestCase):
+    def make_counter(self) -> ViewCounter:
+        return LocalViewCounter()
+
+
+@skipUnless(fakeredis, "fakeredis isn't installed.")
+class RedisViewCounterTests(ViewCounterContract, SimpleTestCase):
+    def make_counter(self) -> ViewCounter:
+        return RedisViewCounter(client=fakeredis.FakeRedis())
+
+
+@override_settings(IMAGES_RANKING_SIZE=2)
+class ImageRankingTests(ImageTestCase):
+    def setUp(self):
+        super().setUp()
+        self.images = []
+        for i in range(3):
+            image = self.create_image(
+                url=f"https://example.com/cat-{i}.png", status=Image.Status.READY
+            )
+            image.image.save(f"cat-{i}.png", ContentFile(PNG))
+            self.images.append(image)
+
+    def view(self, image: Image, times: int = 1):
+        for _ in range(times):
+            response = self.client.get(image.get_absolute_url())
+        return response
+
+    def test_ranking(self):
+        self.view(self.images[0])
+        self.assertContains(self.view(self.images[1], times=3), "3 views")
+        self.view(self.images[2], times=2)
+        self.images[2].delete()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse("images:ranking"))
+        # The deleted image is skipped.
+        self.assertEqual(response.context["most_viewed"], [(self.images[1], 3)])
+        self.assertContains(response, "3 views")
+
+    def test_flush(self):
+        Image.objects.filter(id=self.images[0].id).update(total_views=10)
+        self.view(self.images[0], times=2)
+        self.view(self.images[1])
+
+        out, err = StringIO(), StringIO()
+        with self.assertNumQueries(1):
+            call_command("flush_image_views", stdout=out, stderr=err)
+        self.assertIn("Flushed 3 view(s).", out.getvalue())
+        self.assertIn("only holds the views of this process", err.getvalue())
+        self.assertEqual(
+            dict(Image.objects.values_list("id", "total_views")),
+            {self.images[0].id: 12, self.images[1].id: 1, self.images[2].id: 0},
+        )
+
+        out = StringIO()
+        call_command("flush_image_views", "--rebuild", stdout=out, stderr=StringIO())
+        self.assertIn("Flushed 0 view(s).", out.getvalue())
+        self.assertEqual(
+            get_view_counter().ranking(10),
+            [(self.images[0].id, 12), (self.images[1].id, 1)],
+        )
+
+    @override_settings(DEBUG=False)
+    def test_local_counter_is_for_development(self):
+        [warning] = check_view_counter()
+        self.assertEqual(warning.id, "images.W001")
+        with override_settings(
+            IMAGES_VIEW_COUNTER={
+                "BACKEND": "images.counters.RedisViewCounter",
+                "OPTIONS": {"url": "redis://localhost:6379/0"},
+            }
+        ):
+            self.assertEqual(check_view_counter(), [])
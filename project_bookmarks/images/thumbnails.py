@@ -0,0 +1,122 @@
+"""
+Thumbnails of the bookmarked images.
+
+Every size of THUMBNAIL_SIZES is rendered in the format of the original and,
+with THUMBNAIL_WEBP, in WebP. Derivatives are stored under THUMBNAIL_DIR with
+a name derived from the original file, the size, the format and the quality,
+so they never need to be looked up in the database and a new original or new
+settings get new files. They are generated when an image is fetched, or on
+the first request otherwise.
+"""
+
+import hashlib
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image as PILImage
+from PIL import ImageOps
+
+from images.models import Image
+
+FORMATS = {
+    ".jpg": "jpeg",
+    ".jpeg": "jpeg",
+    ".png": "png",
+    ".webp": "webp",
+}
+
+# Raised by Pillow on the files it can't read: unknown formats
+# (UnidentifiedImageError), truncated files and decompression bombs.
+READ_ERRORS = (OSError, PILImage.DecompressionBombError)
+
+
+def source_format(image: Image) -> str:
+    return FORMATS.get(PurePosixPath(image.image.name).suffix.lower(), "jpeg")
+
+
+def image_formats(image: Image) -> list[str]:
+    formats = [source_format(image)]
+    if settings.THUMBNAIL_WEBP and "webp" not in formats:
+        formats.append("webp")
+    return formats
+
+
+def thumbnail_name(image: Image, size: str, format: str | None = None) -> str:
+    format = format or source_format(image)
+    width, height = settings.THUMBNAIL_SIZES[size]
+    key = hashlib.sha256(
+        f"{image.image.name}:{width}x{height}:{format}:{settings.THUMBNAIL_QUALITY}".encode()
+    ).hexdigest()
+    return f"{settings.THUMBNAIL_DIR}/{key[:2]}/{key}.{format}"
+
+
+def render(original: PILImage.Image, size: tuple[int, int], format: str) -> bytes:
+    thumbnail = ImageOps.exif_transpose(original)
+    if format == "jpeg" and thumbnail.mode not in ("RGB", "L"):
+        thumbnail = thumbnail.convert("RGB")
+    thumbnail.thumbnail(size, PILImage.Resampling.LANCZOS)
+    output = BytesIO()
+    thumbnail.save(output, format=format, quality=settings.THUMBNAIL_QUALITY)
+    return output.getvalue()
+
+
+def generate_thumbnails(
+    image: Image, sizes: list[str] | None = None, formats: list[str] | None = None
+) -> int:
+    """
+    Generate the missing derivatives of the image, opening the original at
+    most once, and return the number generated. Raises one of READ_ERRORS
+    when the original can't be read.
+    """
+    missing = [
+        (size, format, name)
+        for size in sizes or settings.THUMBNAIL_SIZES
+        for format in formats or image_formats(image)
+        if not default_storage.exists(name := thumbnail_name(image, size, format))
+    ]
+    if not missing:
+        return 0
+    with image.image.open("rb") as file, PILImage.open(file) as original:
+        original.load()
+        for size, format, name in missing:
+            content = render(original, settings.THUMBNAIL_SIZES[size], format)
+            # Concurrent renders write the same content, keep the first one.
+            if not default_storage.exists(name):
+                default_storage.save(name, ContentFile(content))
+    return len(missing)
+
+
+def get_thumbnail_url(image: Image, size: str, format: str | None = None) -> str:
+    """
+    Return the URL of a derivative of the image, generating it if needed, the
+    URL of the original when it can't be read, or an empty string while the
+    image isn't downloaded.
+    """
+    if not image.image:
+        return ""
+    name = thumbnail_name(image, size, format)
+    if not default_storage.exists(name):
+        try:
+            generate_thumbnails(
+                image, sizes=[size], formats=[format or source_format(image)]
+            )
+        except READ_ERRORS:
+            return image.image.url
+    return default_storage.url(name)
+
+
+def delete_thumbnails(image: Image) -> int:
+    """
+    Delete the derivatives of the image and return the number deleted.
+    """
+    deleted = 0
+    for size in settings.THUMBNAIL_SIZES:
+        for format in image_formats(image):
+            name = thumbnail_name(image, size, format)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+                deleted += 1
+    return deleted
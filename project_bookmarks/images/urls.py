@@ -1,8 +1,18 @@
 from django.urls import path
 
-from images.views import image_create
+from images.views import (
+    image_create,
+    image_detail,
+    image_list,
+    image_list_fragment,
+    image_ranking,
+)
 
 app_name = "images"
 urlpatterns = [
+    path("", image_list, name="list"),
+    path("fragment/", image_list_fragment, name="list_fragment"),
     path("create/", image_create, name="create"),
+    path("detail/<int:id>/<slug:slug>/", image_detail, name="detail"),
+    path("ranking/", image_ranking, name="ranking"),
 ]
@@ -1,10 +1,14 @@
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.db.models import prefetch_related_objects
 from django.http import HttpRequest, HttpResponse
-from django.shortcuts import redirect, render
+from django.shortcuts import get_object_or_404, redirect, render
 
+from images.counters import get_view_counter
 from images.forms import ImageCreateForm
 from images.models import Image
+from images.pagination import get_page
 
 # Create your views here.
 
@@ -14,9 +18,9 @@ def image_create(request: HttpRequest) -> HttpResponse:
     if request.method == "POST":
         form = ImageCreateForm(data=request.POST)
         if form.is_valid():
-            cd = form.cleaned_data
             new_image: Image = form.save(commit=False)
             new_image.user = request.user
+            # Saved pending, the fetch_images worker downloads the file.
             new_image.save()
             messages.success(request, "Image added successfully")
             return redirect(new_image.get_absolute_url())
@@ -30,3 +34,62 @@ def image_create(request: HttpRequest) -> HttpResponse:
             "form": form,
         },
     )
+
+
+def image_list_context(request: HttpRequest) -> dict:
+    images = Image.objects.filter(status=Image.Status.READY).select_related("user")
+    images, next_cursor = get_page(
+        images, request.GET.get("cursor"), settings.IMAGES_PER_PAGE
+    )
+    # Prefetched for the page only, instead of the whole list.
+    prefetch_related_objects(images, "users_like")
+    return {"section": "images", "images": images, "next_cursor": next_cursor}
+
+
+def image_list(request: HttpRequest) -> HttpResponse:
+    return render(
+        request=request,
+        template_name="images/image/list.html",
+        context=image_list_context(request),
+    )
+
+
+def image_list_fragment(request: HttpRequest) -> HttpResponse:
+    """
+    The images of the next page, appended to the list by infinite scroll.
+    """
+    return render(
+        request=request,
+        template_name="images/image/list_images.html",
+        context=image_list_context(request),
+    )
+
+
+def image_detail(request: HttpRequest, id: int, slug: str) -> HttpResponse:
+    image = get_object_or_404(
+        klass=Image.objects.select_related("user").prefetch_related("users_like"),
+        id=id,
+        slug=slug,
+    )
+    total_views = get_view_counter().incr(image.id)
+    return render(
+        request=request,
+        template_name="images/image/detail.html",
+        context={"section": "images", "image": image, "total_views": total_views},
+    )
+
+
+def image_ranking(request: HttpRequest) -> HttpResponse:
+    ranking = get_view_counter().ranking(settings.IMAGES_RANKING_SIZE)
+    images = Image.objects.select_related("user").in_bulk(
+        [image_id for image_id, _ in ranking]
+    )
+    # Images deleted since they were viewed are skipped.
+    most_viewed = [
+        (images[image_id], views) for image_id, views in ranking if image_id in images
+    ]
+    return render(
+        request=request,
+        template_name="images/image/ranking.html",
+        context={"section": "images", "most_viewed": most_viewed},
+    )
@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from mailqueue.models import OutboundEmail
+
+# Register your models here.
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ["subject", "status", "attempts", "next_attempt", "created", "sent"]
+    list_filter = ["status", "created", "sent"]
+    search_fields = ["subject", "to"]
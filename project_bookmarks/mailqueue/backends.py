@@ -0,0 +1,46 @@
+import base64
+from email.mime.base import MIMEBase
+
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.message import EmailMessage
+
+from mailqueue.models import OutboundEmail
+
+
+def to_outbound_email(message: EmailMessage) -> OutboundEmail:
+    attachments = []
+    for attachment in message.attachments:
+        if isinstance(attachment, MIMEBase):
+            raise ValueError("MIME attachments can't be queued.")
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            content = content.encode()
+        attachments.append([filename, base64.b64encode(content).decode(), mimetype])
+    return OutboundEmail(
+        subject=message.subject,
+        body=message.body,
+        from_email=message.from_email or "",
+        to=list(message.to),
+        cc=list(message.cc),
+        bcc=list(message.bcc),
+        reply_to=list(message.reply_to),
+        headers=dict(message.extra_headers),
+        alternatives=[
+            [content, mimetype]
+            for content, mimetype in getattr(message, "alternatives", [])
+        ],
+        attachments=attachments,
+    )
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """
+    Store the messages in the OutboundEmail table instead of sending them.
+    The process_mail_queue command delivers them with MAIL_QUEUE_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        outbound_emails = OutboundEmail.objects.bulk_create(
+            [to_outbound_email(message) for message in email_messages]
+        )
+        return len(outbound_emails)
@@ -0,0 +1,52 @@
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from profiling.profiler import (
+    Profile,
+    QueryRecorder,
+    current_profile,
+    instrument_templates,
+    record,
+)
+
+
+class ProfilingMiddleware:
+    """
+    Profile a sample of the requests, record the ones slower than
+    PROFILING_RECORD_MS and report the timings in a Server-Timing header.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        instrument_templates()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.PROFILING_SAMPLE_RATE:
+            return self.get_response(request)
+
+        profile = Profile(request.method, request.path)
+        token = current_profile.set(profile)
+        try:
+            with ExitStack() as stack:
+                recorder = QueryRecorder(profile)
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            current_profile.reset(token)
+
+        match = request.resolver_match
+        profile.finish(match.view_name if match else None, response.status_code)
+        if settings.PROFILING_SERVER_TIMING:
+            response.headers["Server-Timing"] = profile.server_timing()
+        if profile.duration >= settings.PROFILING_RECORD_MS and not (
+            match and match.namespace == "profiling"
+        ):
+            record(profile)
+        return response
@@ -0,0 +1,169 @@
+"""
+Per-request profiling.
+
+ProfilingMiddleware opens a Profile for a sample of the requests. While it is
+active, every SQL query goes through a QueryRecorder and the time spent in
+named sections (templates, Markdown, ...) is added up with section(). The
+finished profiles are kept in a bounded in-memory ring buffer, per process.
+"""
+
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+
+from django.conf import settings
+from django.template.base import Template
+
+current_profile: ContextVar["Profile | None"] = ContextVar(
+    "current_profile", default=None
+)
+
+# Created by the first recorded profile, so that importing section() doesn't
+# depend on the profiling settings.
+_buffer: deque[dict] | None = None
+_buffer_lock = Lock()
+
+
+class Profile:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.view = None
+        self.status = None
+        self.start = time.perf_counter()
+        self.duration = 0.0
+        self.query_count = 0
+        self.sql_time = 0.0
+        self.query_times = Counter()
+        self.query_counts = Counter()
+        self.sections = Counter()
+        self.open_sections = Counter()
+
+    def add_query(self, sql: str, duration: float) -> None:
+        self.query_count += 1
+        self.sql_time += duration
+        self.query_counts[sql] += 1
+        self.query_times[sql] += duration
+
+    def finish(self, view: str | None, status: int) -> None:
+        self.view = view
+        self.status = status
+        self.duration = (time.perf_counter() - self.start) * 1000
+
+    def duplicate_queries(self) -> list[dict]:
+        """
+        Queries run at least PROFILING_DUPLICATE_THRESHOLD times with
+        different parameters, usually an N+1 pattern.
+        """
+        return [
+            {"sql": sql, "count": count, "ms": round(self.query_times[sql], 3)}
+            for sql, count in self.query_counts.most_common()
+            if count >= settings.PROFILING_DUPLICATE_THRESHOLD
+        ]
+
+    def slowest_queries(self) -> list[dict]:
+        return [
+            {"sql": sql, "count": self.query_counts[sql], "ms": round(ms, 3)}
+            for sql, ms in self.query_times.most_common(
+                settings.PROFILING_SLOWEST_QUERIES
+            )
+        ]
+
+    def server_timing(self) -> str:
+        metrics = [
+            f'sql;dur={self.sql_time:.3f};desc="{self.query_count} queries"',
+            *(f"{name};dur={ms:.3f}" for name, ms in self.sections.items()),
+            f"total;dur={self.duration:.3f}",
+        ]
+        return ", ".join(metrics)
+
+    def as_dict(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "view": self.view,
+            "status": self.status,
+            "ms": round(self.duration, 3),
+            "queries": self.query_count,
+            "sql_ms": round(self.sql_time, 3),
+            "sections_ms": {name: round(ms, 3) for name, ms in self.sections.items()},
+            "duplicate_queries": self.duplicate_queries(),
+            "slowest_queries": self.slowest_queries(),
+        }
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper timing the queries into a profile.
+    """
+
+    def __init__(self, profile: Profile):
+        self.profile = profile
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.profile.add_query(sql, (time.perf_counter() - start) * 1000)
+
+
+@contextmanager
+def section(name: str):
+    """
+    Add the time spent in the block to the named section of the current
+    profile. Nested blocks of the same section are only counted once.
+    """
+    profile = current_profile.get()
+    if profile is None:
+        yield
+        return
+    profile.open_sections[name] += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.open_sections[name] -= 1
+        if not profile.open_sections[name]:
+            profile.sections[name] += (time.perf_counter() - start) * 1000
+
+
+def instrument_templates() -> None:
+    """
+    Time the rendering of Django templates, included templates being part
+    of the template that includes them.
+    """
+    if getattr(Template.render, "profiled", False):
+        return
+    render = Template.render
+
+    def profiled_render(self, context):
+        with section("template"):
+            return render(self, context)
+
+    profiled_render.profiled = True
+    Template.render = profiled_render
+
+
+def record(profile: Profile) -> None:
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = deque(maxlen=getattr(settings, "PROFILING_BUFFER_SIZE", 200))
+        _buffer.append(profile.as_dict())
+
+
+def recorded() -> list[dict]:
+    """
+    Return the recorded profiles, most recent first.
+    """
+    with _buffer_lock:
+        return list(reversed(_buffer or []))
+
+
+def clear() -> None:
+    with _buffer_lock:
+        if _buffer is not None:
+            _buffer.clear()
@@ -0,0 +1,9 @@
+from django.urls import path
+
+from profiling.views import report
+
+app_name = "profiling"
+
+urlpatterns = [
+    path("", report, name="report"),
+]
@@ -0,0 +1,32 @@
+from collections import defaultdict
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import HttpRequest, JsonResponse
+
+from profiling.profiler import recorded
+
+
+def summarize(profiles: list[dict]) -> dict[str, dict]:
+    views = defaultdict(list)
+    for profile in profiles:
+        views[profile["view"] or profile["path"]].append(profile)
+    return {
+        view: {
+            "requests": len(items),
+            "mean_ms": round(sum(item["ms"] for item in items) / len(items), 3),
+            "max_ms": max(item["ms"] for item in items),
+            "mean_queries": round(
+                sum(item["queries"] for item in items) / len(items), 2
+            ),
+            "mean_sql_ms": round(sum(item["sql_ms"] for item in items) / len(items), 3),
+        }
+        for view, items in views.items()
+    }
+
+
+@staff_member_required
+def report(request: HttpRequest) -> JsonResponse:
+    profiles = recorded()
+    if view := request.GET.get("view"):
+        profiles = [profile for profile in profiles if profile["view"] == view]
+    return JsonResponse({"views": summarize(profiles), "requests": profiles})